@@ -0,0 +1,76 @@
+import copy
+import json
+import pathlib
+
+import pytest
+
+from benchmarks import stub_server as stub_server_lib
+from mopidy_spotify import web
+
+DATA_DIR = pathlib.Path(__file__).parent / "data"
+
+PLAYLIST_SIZE = 10000
+ALBUM_COUNT = 500
+ARTIST_COUNT = 200
+
+
+def load_payload(name):
+    with open(DATA_DIR / f"{name}.json") as fh:
+        return json.load(fh)
+
+
+@pytest.fixture(scope="session")
+def web_playlist():
+    """A recorded playlist payload blown up to 10k distinct tracks."""
+    playlist = load_payload("playlist")
+    template = playlist["tracks"]["items"][0]
+    items = []
+    for i in range(PLAYLIST_SIZE):
+        item = copy.deepcopy(template)
+        track = item["track"]
+        track["uri"] = f"spotify:track:{i:022d}"
+        track["album"]["uri"] = f"spotify:album:{i % ALBUM_COUNT:022d}"
+        artist_uri = f"spotify:artist:{i % ARTIST_COUNT:022d}"
+        track["artists"][0]["uri"] = artist_uri
+        track["album"]["artists"][0]["uri"] = artist_uri
+        items.append(item)
+    playlist["tracks"]["items"] = items
+    playlist["tracks"]["total"] = len(items)
+    return playlist
+
+
+@pytest.fixture(scope="session")
+def web_tracks(web_playlist):
+    return [item["track"] for item in web_playlist["tracks"]["items"]]
+
+
+@pytest.fixture(scope="session")
+def stub_server():
+    server = stub_server_lib.StubServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def oauth_client(stub_server):
+    client = web.OAuthClient(
+        base_url=stub_server.base_url,
+        refresh_url=stub_server.token_url,
+        client_id="abcd1234",
+        client_secret="YWJjZDEyMzQ=",
+    )
+    yield client
+    client._session.close()
+
+
+@pytest.fixture
+def spotify_client(stub_server):
+    client = web.SpotifyOAuthClient(
+        client_id="abcd1234",
+        client_secret="YWJjZDEyMzQ=",
+        proxy_config=None,
+        base_url=stub_server.base_url,
+        refresh_url=stub_server.token_url,
+    )
+    yield client
+    client._session.close()
@@ -0,0 +1,410 @@
+"""Local stand-in for the subset of the Spotify Web API used by web.py.
+
+The server serves a generated catalog of playlists, tracks, albums and
+artists, and can be configured to add latency, inject ``429 Too Many
+Requests`` responses and send ``Cache-Control`` and ``ETag`` headers.
+
+Run it standalone with::
+
+    python -m benchmarks.stub_server --port 8080 --latency 0.05
+
+Query parameters other than paging, ``ids``, ``type`` and ``limit`` are
+ignored, in particular ``fields`` always returns the full objects.
+
+Point Mopidy-Spotify at it with the ``spotify/web_api_base_url`` and
+``spotify/web_api_token_url`` config values, e.g.
+``http://127.0.0.1:8080/v1`` and ``http://127.0.0.1:8080/api/token``.
+"""
+
+import argparse
+import dataclasses
+import hashlib
+import http.server
+import json
+import re
+import threading
+import time
+import urllib.parse
+
+USER_ID = "alice"
+PAGE_LIMIT = 100
+
+
+@dataclasses.dataclass
+class Options:
+    #: Seconds to wait before answering each request.
+    latency: float = 0.0
+    #: Answer every n-th request with 429 Too Many Requests; 0 disables it.
+    rate_limit_every: int = 0
+    #: Value of the Retry-After header sent with 429 responses.
+    retry_after: int = 1
+    #: Value of the Cache-Control max-age sent with successful responses.
+    max_age: int = 3600
+    #: Whether to send ETags and answer If-None-Match with 304 Not Modified.
+    etags: bool = True
+    playlist_count: int = 20
+    tracks_per_playlist: int = 500
+    track_count: int = 5000
+    album_count: int = 500
+    artist_count: int = 200
+
+
+def _id(kind, index):
+    return f"{kind[:2]}{index:020d}"
+
+
+def _images(seed):
+    url = f"https://i.scdn.co/image/{seed}"
+    return [
+        {"url": f"{url}/{size}", "height": size, "width": size}
+        for size in (640, 300, 64)
+    ]
+
+
+class Catalog:
+    """Deterministic fake Spotify catalog."""
+
+    def __init__(self, options):
+        self.artists = {}
+        self.albums = {}
+        self.album_tracks = {}
+        self.tracks = {}
+        self.playlists = {}
+
+        for i in range(options.artist_count):
+            artist_id = _id("artist", i)
+            self.artists[artist_id] = {
+                "id": artist_id,
+                "name": f"Artist {i}",
+                "type": "artist",
+                "uri": f"spotify:artist:{artist_id}",
+                "images": _images(artist_id),
+            }
+
+        for i in range(options.album_count):
+            album_id = _id("album", i)
+            artist = self.artists[_id("artist", i % options.artist_count)]
+            self.albums[album_id] = {
+                "id": album_id,
+                "name": f"Album {i}",
+                "type": "album",
+                "uri": f"spotify:album:{album_id}",
+                "artists": [self._simple(artist)],
+                "images": _images(album_id),
+                "release_date": f"{1970 + i % 50}-01-01",
+            }
+
+        for i in range(options.track_count):
+            track_id = _id("track", i)
+            album = self.albums[_id("album", i % options.album_count)]
+            self.tracks[track_id] = {
+                "id": track_id,
+                "name": f"Track {i}",
+                "type": "track",
+                "uri": f"spotify:track:{track_id}",
+                "album": album,
+                "artists": album["artists"],
+                "disc_number": 1,
+                "track_number": i % 12 + 1,
+                "duration_ms": 180000 + i % 120000,
+                "is_playable": True,
+            }
+            self.album_tracks.setdefault(album["id"], []).append(
+                self.tracks[track_id]
+            )
+
+        track_ids = list(self.tracks)
+        for i in range(options.playlist_count):
+            playlist_id = _id("playlist", i)
+            start = i * options.tracks_per_playlist
+            self.playlists[playlist_id] = {
+                "id": playlist_id,
+                "name": f"Playlist {i}",
+                "type": "playlist",
+                "uri": f"spotify:playlist:{playlist_id}",
+                "owner": {"id": USER_ID},
+                "snapshot_id": f"snapshot-{playlist_id}",
+                "images": _images(playlist_id),
+                "track_ids": [
+                    track_ids[(start + j) % len(track_ids)]
+                    for j in range(options.tracks_per_playlist)
+                ],
+            }
+
+    def _simple(self, item):
+        return {k: item[k] for k in ("id", "name", "type", "uri")}
+
+    def simple_playlist(self, playlist):
+        result = {k: v for k, v in playlist.items() if k not in ("track_ids",)}
+        result["tracks"] = {"total": len(playlist["track_ids"])}
+        return result
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):  # noqa: N802
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        if not self._before_request():
+            return
+        self._send_json(
+            {"access_token": "stub", "token_type": "Bearer", "expires_in": 3600}
+        )
+
+    def do_GET(self):  # noqa: N802
+        if not self._before_request():
+            return
+        url = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        path = url.path
+        if path.startswith("/v1/"):
+            path = path[len("/v1/") :]
+        for pattern, method in self.routes:
+            match = re.fullmatch(pattern, path)
+            if match:
+                data = method(self, query, *match.groups())
+                break
+        else:
+            data = None
+        if data is None:
+            self._send_json({"error": {"status": 404}}, status=404)
+        else:
+            self._send_json(data, cacheable=True)
+
+    def _before_request(self):
+        server = self.server
+        with server.lock:
+            server.stats["requests"] += 1
+            count = server.stats["requests"]
+        if server.options.latency:
+            time.sleep(server.options.latency)
+        every = server.options.rate_limit_every
+        if every and count % every == 0:
+            with server.lock:
+                server.stats["rate_limited"] += 1
+            self._send_json(
+                {"error": {"status": 429, "message": "API rate limit"}},
+                status=429,
+                headers={"Retry-After": str(server.options.retry_after)},
+            )
+            return False
+        return True
+
+    def _send_json(self, data, status=200, headers=None, cacheable=False):
+        body = json.dumps(data).encode()
+        headers = dict(headers or {})
+        options = self.server.options
+        if cacheable:
+            headers["Cache-Control"] = f"public, max-age={options.max_age}"
+            if options.etags:
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                headers["ETag"] = etag
+                if self.headers.get("If-None-Match") == etag:
+                    with self.server.lock:
+                        self.server.stats["not_modified"] += 1
+                    status, body = 304, b""
+
+        self.send_response(status)
+        if body:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _page(self, items, query, path):
+        offset = int(query.get("offset", 0))
+        limit = int(query.get("limit", PAGE_LIMIT))
+        page = {
+            "href": self._url(path, offset, limit),
+            "items": items[offset : offset + limit],
+            "limit": limit,
+            "offset": offset,
+            "total": len(items),
+            "next": None,
+        }
+        if offset + limit < len(items):
+            page["next"] = self._url(path, offset + limit, limit)
+        return page
+
+    def _url(self, path, offset, limit):
+        host, port = self.server.server_address[:2]
+        query = urllib.parse.urlencode({"offset": offset, "limit": limit})
+        return f"http://{host}:{port}/v1/{path}?{query}"
+
+    def _ids(self, query, items):
+        ids = query.get("ids", "").split(",")
+        return [items.get(i) for i in ids if i]
+
+    # Routes
+
+    def me(self, query):
+        return {"id": USER_ID, "display_name": "Alice"}
+
+    def me_playlists(self, query):
+        catalog = self.server.catalog
+        items = [catalog.simple_playlist(p) for p in catalog.playlists.values()]
+        return self._page(items, query, "me/playlists")
+
+    def me_tracks(self, query):
+        tracks = list(self.server.catalog.tracks.values())[:PAGE_LIMIT]
+        return self._page([{"track": t} for t in tracks], query, "me/tracks")
+
+    def playlist(self, query, playlist_id):
+        catalog = self.server.catalog
+        playlist = catalog.playlists.get(playlist_id)
+        if playlist is None:
+            return None
+        result = catalog.simple_playlist(playlist)
+        result["tracks"] = self.playlist_tracks(query, playlist_id)
+        return result
+
+    def playlist_tracks(self, query, playlist_id):
+        catalog = self.server.catalog
+        playlist = catalog.playlists.get(playlist_id)
+        if playlist is None:
+            return None
+        items = [{"track": catalog.tracks[i]} for i in playlist["track_ids"]]
+        return self._page(items, query, f"playlists/{playlist_id}/tracks")
+
+    def tracks(self, query):
+        return {"tracks": self._ids(query, self.server.catalog.tracks)}
+
+    def track(self, query, track_id):
+        return self.server.catalog.tracks.get(track_id)
+
+    def albums(self, query):
+        albums = self._ids(query, self.server.catalog.albums)
+        return {"albums": [self._full_album(a) for a in albums]}
+
+    def album(self, query, album_id):
+        return self._full_album(self.server.catalog.albums.get(album_id))
+
+    def _full_album(self, album):
+        if album is None:
+            return None
+        tracks = self.server.catalog.album_tracks.get(album["id"], [])
+        return dict(
+            album, tracks=self._page(tracks, {}, f"albums/{album['id']}/tracks")
+        )
+
+    def artists(self, query):
+        return {"artists": self._ids(query, self.server.catalog.artists)}
+
+    def artist(self, query, artist_id):
+        return self.server.catalog.artists.get(artist_id)
+
+    def search(self, query):
+        catalog = self.server.catalog
+        limit = int(query.get("limit", 20))
+        types = query.get("type", "track").split(",")
+        result = {}
+        for name, items in (
+            ("track", catalog.tracks),
+            ("album", catalog.albums),
+            ("artist", catalog.artists),
+        ):
+            if name in types:
+                items = list(items.values())[:limit]
+                result[f"{name}s"] = self._page(items, query, "search")
+        return result
+
+    def featured_playlists(self, query):
+        catalog = self.server.catalog
+        items = [catalog.simple_playlist(p) for p in catalog.playlists.values()]
+        return {
+            "message": "Stub picks",
+            "playlists": self._page(items, query, "browse/featured-playlists"),
+        }
+
+
+StubHandler.routes = [
+    (r"me", StubHandler.me),
+    (r"me/playlists", StubHandler.me_playlists),
+    (r"me/tracks", StubHandler.me_tracks),
+    (r"playlists/([^/]+)", StubHandler.playlist),
+    (r"playlists/([^/]+)/tracks", StubHandler.playlist_tracks),
+    (r"tracks", StubHandler.tracks),
+    (r"tracks/([^/]+)", StubHandler.track),
+    (r"albums", StubHandler.albums),
+    (r"albums/([^/]+)", StubHandler.album),
+    (r"artists", StubHandler.artists),
+    (r"artists/([^/]+)", StubHandler.artist),
+    (r"search", StubHandler.search),
+    (r"browse/featured-playlists", StubHandler.featured_playlists),
+]
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, options=None):
+        super().__init__((host, port), StubHandler)
+        self.options = options or Options()
+        self.catalog = Catalog(self.options)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "rate_limited": 0, "not_modified": 0}
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self):
+        return f"{self.url}/v1"
+
+    @property
+    def token_url(self):
+        return f"{self.url}/api/token"
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="SpotifyStubServer", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--no-etags", dest="etags", action="store_false")
+    for field in dataclasses.fields(Options):
+        if field.type is not bool:
+            parser.add_argument(
+                "--" + field.name.replace("_", "-"),
+                type=field.type,
+                default=field.default,
+            )
+    args = parser.parse_args()
+
+    options = Options(
+        **{f.name: getattr(args, f.name) for f in dataclasses.fields(Options)}
+    )
+    server = StubServer(args.host, args.port, options)
+    print(f"Serving stub Spotify Web API on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+from mopidy_spotify import compact, translator
+
+
+def test_compact_10k_tracks(benchmark, web_playlist):
+    items = web_playlist["tracks"]["items"]
+
+    result = benchmark(compact.TrackList.from_items, items)
+
+    assert len(result) == len(items)
+
+
+def test_to_playlist_10k_compact_tracks(benchmark, web_playlist):
+    items = compact.TrackList.from_items(web_playlist["tracks"]["items"])
+    playlist = dict(web_playlist, tracks={"items": items})
+
+    result = benchmark.pedantic(
+        translator.to_playlist,
+        args=(playlist,),
+        kwargs={"bitrate": 160},
+        setup=translator.clear_caches,
+        rounds=10,
+    )
+
+    assert len(result.tracks) == len(items)
@@ -0,0 +1,44 @@
+from unittest import mock
+
+import pytest
+
+from mopidy_spotify import images
+
+
+@pytest.fixture
+def web_client(web_tracks):
+    tracks = {t["uri"].split(":")[-1]: t for t in web_tracks}
+
+    def get(path, params=None):
+        ids = params["ids"].split(",")
+        return {"tracks": [dict(tracks[i], id=i) for i in ids]}
+
+    return mock.Mock(get=mock.Mock(side_effect=get))
+
+
+@pytest.fixture
+def track_uris(web_tracks):
+    return [t["uri"] for t in web_tracks[:1000]]
+
+
+def clear_image_cache():
+    images._cache.clear()
+
+
+def test_get_images_1k_uris(benchmark, web_client, track_uris):
+    result = benchmark.pedantic(
+        images.get_images,
+        args=(web_client, track_uris),
+        setup=clear_image_cache,
+        rounds=20,
+    )
+
+    assert len(result) == len(track_uris)
+
+
+def test_get_images_1k_uris_cached(benchmark, web_client, track_uris):
+    images.get_images(web_client, track_uris)
+
+    result = benchmark(images.get_images, web_client, track_uris)
+
+    assert len(result) == len(track_uris)
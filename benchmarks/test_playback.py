@@ -0,0 +1,36 @@
+import threading
+import types
+
+import spotify
+from mopidy_spotify import playback
+
+FRAMES_PER_DELIVERY = 2048
+FRAME_SIZE = 4  # 16-bit stereo
+
+
+def test_music_delivery_throughput(benchmark):
+    feeder = playback.AudioFeeder(audio_actor=None, max_buffers=1 << 30)
+    audio_format = types.SimpleNamespace(
+        sample_type=spotify.SampleType.INT16_NATIVE_ENDIAN,
+        sample_rate=44100,
+    )
+    frames = bytes(FRAMES_PER_DELIVERY * FRAME_SIZE)
+    push_audio_data_event = threading.Event()
+    push_audio_data_event.set()
+
+    def deliver():
+        consumed = playback.music_delivery_callback(
+            None,
+            audio_format,
+            frames,
+            FRAMES_PER_DELIVERY,
+            feeder,
+            threading.Event(),
+            push_audio_data_event,
+            playback.BufferTimestamp(0),
+            playback.PlaybackStats(),
+        )
+        feeder.clear()
+        return consumed
+
+    assert benchmark(deliver) == FRAMES_PER_DELIVERY
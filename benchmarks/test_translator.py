@@ -0,0 +1,21 @@
+from mopidy_spotify import translator
+
+
+def test_to_playlist_10k_tracks(benchmark, web_playlist):
+    result = benchmark.pedantic(
+        translator.to_playlist,
+        args=(web_playlist,),
+        kwargs={"bitrate": 160},
+        setup=translator.clear_caches,
+        rounds=10,
+    )
+
+    assert len(result.tracks) == len(web_playlist["tracks"]["items"])
+
+
+def test_to_playlist_10k_tracks_memoized(benchmark, web_playlist):
+    translator.to_playlist(web_playlist, bitrate=160)
+
+    result = benchmark(translator.to_playlist, web_playlist, bitrate=160)
+
+    assert len(result.tracks) == len(web_playlist["tracks"]["items"])
@@ -0,0 +1,72 @@
+import pytest
+
+from benchmarks import stub_server as stub_server_lib
+
+TRACK_PATH = f"tracks/{stub_server_lib._id('track', 0)}"
+
+
+def test_get_cache_miss(benchmark, oauth_client):
+    result = benchmark(oauth_client.get, TRACK_PATH)
+
+    assert result.status_ok
+
+
+def test_get_cache_hit(benchmark, oauth_client):
+    cache = {}
+    oauth_client.get(TRACK_PATH, cache)
+
+    result = benchmark(oauth_client.get, TRACK_PATH, cache)
+
+    assert result.status_ok
+
+
+def load_all_playlists(client):
+    client.clear_cache()
+    playlists = [
+        client.get_playlist(playlist["uri"])
+        for playlist in client.get_user_playlists()
+    ]
+    return sum(len(p["tracks"]["items"]) for p in playlists)
+
+
+def test_load_all_playlists(benchmark, stub_server, spotify_client):
+    options = stub_server.options
+    expected = options.playlist_count * options.tracks_per_playlist
+
+    result = benchmark.pedantic(
+        load_all_playlists, args=(spotify_client,), rounds=5
+    )
+
+    assert result == expected
+    # Reloading revalidates the expired responses using their ETags.
+    load_all_playlists(spotify_client)
+    assert stub_server.stats["not_modified"] > 0
+
+
+@pytest.fixture
+def rate_limited_server(stub_server):
+    options = stub_server.options
+    rate_limit_every, retry_after = (
+        options.rate_limit_every,
+        options.retry_after,
+    )
+    options.rate_limit_every, options.retry_after = 10, 0
+    yield stub_server
+    options.rate_limit_every, options.retry_after = (
+        rate_limit_every,
+        retry_after,
+    )
+
+
+def test_load_all_playlists_with_rate_limiting(
+    benchmark, rate_limited_server, spotify_client
+):
+    options = rate_limited_server.options
+    expected = options.playlist_count * options.tracks_per_playlist
+
+    result = benchmark.pedantic(
+        load_all_playlists, args=(spotify_client,), rounds=5
+    )
+
+    assert result == expected
+    assert rate_limited_server.stats["rate_limited"] > 0
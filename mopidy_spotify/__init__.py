@@ -34,6 +34,15 @@ class Extension(ext.Extension):
         schema["settings_dir"] = config.Deprecated()  # since 2.0
 
         schema["allow_cache"] = config.Boolean()
+        schema["web_cache_max_entries"] = config.Integer(minimum=0)
+        schema["web_cache_max_megabytes"] = config.Integer(minimum=0)
+        schema["image_cache_max_entries"] = config.Integer(minimum=0)
+        schema["image_cache_ttl"] = config.Integer(minimum=0)
+        schema["web_api_base_url"] = config.String(optional=True)
+        schema["web_api_token_url"] = config.String(optional=True)
+        schema["web_api_max_connections"] = config.Integer(minimum=1)
+        schema["web_api_rate_limit"] = config.Integer(optional=True, minimum=1)
+        schema["web_api_rate_limit_burst"] = config.Integer(minimum=1)
         schema["allow_network"] = config.Boolean()
         schema["allow_playlists"] = config.Boolean()
 
@@ -6,7 +6,7 @@ import pykka
 from mopidy import backend, httpclient
 
 import spotify
-from mopidy_spotify import Extension, library, playback, playlists, web
+from mopidy_spotify import Extension, images, library, playback, playlists, web
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +34,7 @@ class SpotifyBackend(pykka.ThreadingActor, backend.Backend):
         self._event_loop = None
         self._bitrate = None
         self._web_client = None
+        self._web_client_async = None
 
         self.library = library.SpotifyLibraryProvider(backend=self)
         self.playback = playback.SpotifyPlaybackProvider(
@@ -61,17 +62,49 @@ class SpotifyBackend(pykka.ThreadingActor, backend.Backend):
             client_id=self._config["spotify"]["client_id"],
             client_secret=self._config["spotify"]["client_secret"],
             proxy_config=self._config["proxy"],
+            base_url=self._config["spotify"]["web_api_base_url"],
+            refresh_url=self._config["spotify"]["web_api_token_url"],
+            max_connections=self._config["spotify"]["web_api_max_connections"],
+            rate_limit=self._config["spotify"]["web_api_rate_limit"],
+            rate_limit_burst=self._config["spotify"][
+                "web_api_rate_limit_burst"
+            ],
+            cache_path=self._get_web_cache_path(self._config),
+            cache_max_entries=self._config["spotify"]["web_cache_max_entries"],
+            cache_max_bytes=(
+                self._config["spotify"]["web_cache_max_megabytes"] * 1024 * 1024
+            ),
         )
         self._web_client.login()
+        images.configure_cache(
+            max_entries=self._config["spotify"]["image_cache_max_entries"],
+            ttl=self._config["spotify"]["image_cache_ttl"],
+            path=self._get_image_cache_path(self._config),
+        )
+        self._web_client_async = web.AsyncSpotifyOAuthClient(
+            self._web_client,
+            max_concurrency=self._config["spotify"]["web_api_max_connections"],
+        )
 
         if self.playlists is not None:
             self.playlists.refresh()
 
     def on_stop(self):
+        if self.playlists is not None:
+            self.playlists.stop_refresh()
+        if self._web_client is not None:
+            self._web_client.save_cache()
+        images.save_cache()
+        if self._web_client_async is not None:
+            self._web_client_async.close()
+        if self._web_client is not None:
+            self._web_client.close()
+
         logger.debug("Logging out of Spotify")
         self._session.logout()
         self._logged_out.wait()
         self._event_loop.stop()
+        self.playback.close()
 
     def _get_session(self, config):
         session = spotify.Session(self._get_spotify_config(config))
@@ -123,6 +156,16 @@ class SpotifyBackend(pykka.ThreadingActor, backend.Backend):
 
         return spotify_config
 
+    def _get_web_cache_path(self, config):
+        if not config["spotify"]["allow_cache"]:
+            return None
+        return Extension().get_cache_dir(config) / "web_cache.db"
+
+    def _get_image_cache_path(self, config):
+        if not config["spotify"]["allow_cache"]:
+            return None
+        return Extension().get_cache_dir(config) / "image_cache.db"
+
     def on_logged_in(self):
         if self._config["spotify"]["private_session"]:
             logger.info("Spotify private session activated")
@@ -0,0 +1,186 @@
+import collections
+import contextlib
+import json
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PersistentStore:
+    """Key/value store persisted in an SQLite database file.
+
+    Values must be JSON serializable, or handled by ``default`` which is
+    passed on to :func:`json.dumps` along with ``object_hook`` to
+    :func:`json.loads`. The whole store is read with :meth:`load` and written
+    back with :meth:`save`, so the database is only touched at startup and at
+    well defined save points, never on the request path.
+    """
+
+    def __init__(self, path, default=None, object_hook=None):
+        self._path = path
+        self._default = default
+        self._object_hook = object_hook
+
+    @contextlib.contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(str(self._path))
+        try:
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS cache "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+                )
+                yield connection
+        finally:
+            connection.close()
+
+    def load(self):
+        try:
+            with self._connect() as connection:
+                rows = connection.execute("SELECT key, value FROM cache")
+                return {
+                    key: json.loads(value, object_hook=self._object_hook)
+                    for key, value in rows
+                }
+        except (sqlite3.Error, ValueError) as exc:
+            logger.warning(f"Failed to load cache from {self._path}: {exc}")
+            return {}
+
+    def save(self, items):
+        rows = [
+            (key, json.dumps(value, default=self._default))
+            for key, value in items.items()
+        ]
+        try:
+            with self._connect() as connection:
+                connection.execute("DELETE FROM cache")
+                connection.executemany(
+                    "INSERT INTO cache (key, value) VALUES (?, ?)", rows
+                )
+        except sqlite3.Error as exc:
+            logger.warning(f"Failed to save cache to {self._path}: {exc}")
+            return False
+        return True
+
+
+class LRUCache(collections.abc.MutableMapping):
+    """Thread-safe mapping with least recently used eviction.
+
+    The cache is bounded by number of entries and/or total size, where the
+    size of each value is given by ``sizeof``. When a bound is exceeded,
+    values for which ``is_expired`` returns true are evicted first, then the
+    least recently used ones. Eviction continues down to a low watermark so
+    that the cost of a sweep is amortized over many insertions.
+    """
+
+    LOW_WATERMARK = 0.9
+
+    def __init__(
+        self, max_entries=None, max_bytes=None, sizeof=None, is_expired=None
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda value: 0)
+        self._is_expired = is_expired
+
+        self._data = collections.OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getitem__(self, key):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                raise
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            size = self._sizeof(value)
+            self._data[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+            if self._over_limit(1.0):
+                self._evict(keep=key)
+
+    def peek(self, key, default=None):
+        """Get a value without counting a hit or marking it as recently used."""
+        return self._data.get(key, default)
+
+    def __delitem__(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._data))
+
+    def __len__(self):
+        return len(self._data)
+
+    def items(self):
+        with self._lock:
+            return list(self._data.items())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    @property
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, key):
+        del self._data[key]
+        self._bytes -= self._sizes.pop(key)
+
+    def _over_limit(self, factor):
+        return (
+            self.max_entries is not None
+            and len(self._data) > self.max_entries * factor
+        ) or (
+            self.max_bytes is not None and self._bytes > self.max_bytes * factor
+        )
+
+    def _evict(self, keep):
+        if self._is_expired is not None:
+            expired = [
+                k
+                for k, v in self._data.items()
+                if k != keep and self._is_expired(v)
+            ]
+            for key in expired:
+                self._remove(key)
+                self.evictions += 1
+
+        while self._over_limit(self.LOW_WATERMARK):
+            key = next(iter(self._data))
+            if key == keep:
+                break
+            self._remove(key)
+            self.evictions += 1
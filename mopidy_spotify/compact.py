@@ -0,0 +1,316 @@
+import collections.abc
+import threading
+import weakref
+
+# Compact, shared representation of the tracks in Web API playlists.
+#
+# Playlist track pages include full album and artist objects for every
+# track, with markets, images, external URLs and so on. Only the fields the
+# translator and image lookups use are kept, in slotted records, and albums,
+# artists and tracks with identical data are shared between all pages and
+# playlists. The records are read-only mappings, so they can be used in place
+# of the original dicts.
+
+_JSON_KEY = "__compact_tracks__"
+
+_interned = {}  # record class -> {uri: record}
+_interned_lock = threading.Lock()
+
+
+class _Record(collections.abc.Mapping):
+    """Read-only mapping of the fields of a record which are not None."""
+
+    __slots__ = ()
+    _fields = ()
+
+    def __init__(self, *values):
+        for field, value in zip(self._fields, values):
+            setattr(self, field, value)
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in self._fields else None
+        if value is None:
+            return default
+        return self._view(key, value)
+
+    def __iter__(self):
+        return (f for f in self._fields if getattr(self, f) is not None)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}{self._values()!r}"
+
+    def _values(self):
+        return tuple(getattr(self, f) for f in self._fields)
+
+    def _view(self, key, value):
+        return value
+
+    @classmethod
+    def _create(cls, *values):
+        """Return a shared record with the given values."""
+        uri = values[0]
+        if uri is None:
+            return cls(*values)
+
+        with _interned_lock:
+            records = _interned.setdefault(cls, weakref.WeakValueDictionary())
+            record = records.get(uri)
+            if record is None or record._values() != values:
+                record = records[uri] = cls(*values)
+            return record
+
+
+class Artist(_Record):
+    __slots__ = _fields = ("uri", "name", "type")
+    __slots__ += ("__weakref__",)
+
+    @classmethod
+    def from_web(cls, web_artist):
+        return cls._create(
+            web_artist.get("uri"),
+            web_artist.get("name"),
+            web_artist.get("type"),
+        )
+
+
+class Album(_Record):
+    __slots__ = _fields = ("uri", "name", "type", "artists", "images")
+    __slots__ += ("__weakref__",)
+
+    @classmethod
+    def from_web(cls, web_album):
+        images = web_album.get("images")
+        if images is not None:
+            images = tuple(
+                (i.get("url"), i.get("height"), i.get("width")) for i in images
+            )
+        return cls._create(
+            web_album.get("uri"),
+            web_album.get("name"),
+            web_album.get("type"),
+            _artists_from_web(web_album.get("artists")),
+            images,
+        )
+
+    def _view(self, key, value):
+        if key == "artists":
+            return list(value)
+        elif key == "images":
+            return [
+                {"url": url, "height": height, "width": width}
+                for url, height, width in value
+            ]
+        return value
+
+
+class Track(_Record):
+    __slots__ = _fields = (
+        "uri",
+        "name",
+        "type",
+        "duration_ms",
+        "disc_number",
+        "track_number",
+        "is_playable",
+        "linked_from",
+        "album",
+        "artists",
+    )
+    __slots__ += ("__weakref__",)
+
+    @classmethod
+    def from_web(cls, web_track):
+        web_album = web_track.get("album")
+        linked_from = web_track.get("linked_from") or {}
+        return cls._create(
+            web_track.get("uri"),
+            web_track.get("name"),
+            web_track.get("type"),
+            web_track.get("duration_ms"),
+            web_track.get("disc_number"),
+            web_track.get("track_number"),
+            web_track.get("is_playable"),
+            linked_from.get("uri"),
+            Album.from_web(web_album) if web_album is not None else None,
+            _artists_from_web(web_track.get("artists")),
+        )
+
+    def _view(self, key, value):
+        if key == "linked_from":
+            return {"uri": value}
+        elif key == "artists":
+            return list(value)
+        return value
+
+
+def _artists_from_web(web_artists):
+    if web_artists is None:
+        return None
+    return tuple(Artist.from_web(a) for a in web_artists)
+
+
+class _Raw:
+    """Playlist item which is not a plain track item, kept as is."""
+
+    __slots__ = ("item",)
+
+    def __init__(self, item):
+        self.item = item
+
+
+class TrackList(collections.abc.Sequence):
+    """Compact replacement for the ``items`` list of a playlist track page.
+
+    Items are returned as ``{"track": Track}`` dicts created on access.
+    """
+
+    __slots__ = ("_entries",)
+
+    def __init__(self, entries=()):
+        self._entries = list(entries)
+
+    @classmethod
+    def from_items(cls, items):
+        if isinstance(items, cls):
+            return items
+        return cls(_entry_from_item(item) for item in items)
+
+    @classmethod
+    def join(cls, track_lists):
+        result = cls()
+        for track_list in track_lists:
+            result._entries.extend(cls.from_items(track_list)._entries)
+        return result
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TrackList(self._entries[index])
+        return _item_from_entry(self._entries[index])
+
+    def __iter__(self):
+        return map(_item_from_entry, self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, TrackList)):
+            return NotImplemented
+        return len(self) == len(other) and list(self) == list(other)
+
+    def __repr__(self):
+        return f"TrackList({list(self)!r})"
+
+
+def _entry_from_item(item):
+    # Only the track of each item is used, other fields like "added_at" are
+    # dropped along with the unused track fields.
+    if isinstance(item, dict) and "track" in item:
+        web_track = item["track"]
+        if web_track is None:
+            return None
+        elif isinstance(web_track, dict):
+            return Track.from_web(web_track)
+    return _Raw(item)
+
+
+def _item_from_entry(entry):
+    if isinstance(entry, _Raw):
+        return entry.item
+    return {"track": entry}
+
+
+def to_json(obj):
+    """Encode a :class:`TrackList` as JSON, for use as ``json.dumps`` default.
+
+    Albums and artists are written once, in tables referenced by index.
+    """
+    if not isinstance(obj, TrackList):
+        raise TypeError(f"{obj.__class__.__name__} is not JSON serializable")
+
+    # Records are not hashable, so they are indexed by identity.
+    artists, albums = {}, {}  # id(record) -> (index, record)
+
+    def ref(table, record):
+        if id(record) not in table:
+            table[id(record)] = (len(table), record)
+        return table[id(record)][0]
+
+    def artist_refs(values):
+        if values is None:
+            return None
+        return [ref(artists, a) for a in values]
+
+    def album_ref(album):
+        if album is None:
+            return None
+        return ref(albums, album)
+
+    entries = []
+    for entry in obj._entries:
+        if entry is None:
+            entries.append(None)
+        elif isinstance(entry, _Raw):
+            entries.append({"raw": entry.item})
+        else:
+            values = list(entry._values())
+            values[-2] = album_ref(entry.album)
+            values[-1] = artist_refs(entry.artists)
+            entries.append(values)
+
+    album_rows = []
+    for _, album in albums.values():
+        values = list(album._values())
+        values[-2] = artist_refs(album.artists)
+        album_rows.append(values)
+
+    return {
+        _JSON_KEY: {
+            "artists": [list(a._values()) for _, a in artists.values()],
+            "albums": album_rows,
+            "tracks": entries,
+        }
+    }
+
+
+def from_json(data):
+    """Decode a :class:`TrackList`, for use as ``json.loads`` object_hook."""
+    if len(data) != 1 or _JSON_KEY not in data:
+        return data
+
+    table = data[_JSON_KEY]
+    artists = [Artist._create(*values) for values in table["artists"]]
+
+    def artist_refs(refs):
+        if refs is None:
+            return None
+        return tuple(artists[i] for i in refs)
+
+    albums = []
+    for values in table["albums"]:
+        values[-2] = artist_refs(values[-2])
+        if values[-1] is not None:
+            values[-1] = tuple(tuple(image) for image in values[-1])
+        albums.append(Album._create(*values))
+
+    entries = []
+    for values in table["tracks"]:
+        if values is None:
+            entries.append(None)
+        elif isinstance(values, dict):
+            entries.append(_Raw(values["raw"]))
+        else:
+            if values[-2] is not None:
+                values[-2] = albums[values[-2]]
+            values[-1] = artist_refs(values[-1])
+            entries.append(Track._create(*values))
+    return TrackList(entries)
@@ -1,10 +1,15 @@
+import collections
 import itertools
 import logging
 import operator
+import threading
+import time
 import urllib.parse
 
 from mopidy import models
 
+from mopidy_spotify import cache
+
 # NOTE: This module is independent of libspotify and built using the Spotify
 # Web APIs. As such it does not tie in with any of the regular code used
 # elsewhere in the mopidy-spotify extensions. It is also intended to be used
@@ -12,31 +17,243 @@ from mopidy import models
 
 _API_MAX_IDS_PER_REQUEST = 50
 
-_cache = {}  # (type, id) -> [Image(), ...]
+_SUPPORTED_TYPES = ("track", "album", "artist", "playlist")
+
+DEFAULT_CACHE_MAX_ENTRIES = 50000
+DEFAULT_CACHE_TTL = 7 * 24 * 60 * 60
 
 logger = logging.getLogger(__name__)
 
+_CacheEntry = collections.namedtuple("_CacheEntry", ["images", "expires"])
+
+
+class ImageCache:
+    """Thread-safe cache of images keyed by ``(type, id)``.
+
+    At most ``max_entries`` entries are kept, evicting the least recently
+    used ones first, and entries expire ``ttl`` seconds after they were
+    stored. If ``path`` is given, the cache is loaded from that file and
+    written back to it by :meth:`save`.
+    """
+
+    def __init__(
+        self,
+        max_entries=DEFAULT_CACHE_MAX_ENTRIES,
+        ttl=DEFAULT_CACHE_TTL,
+        path=None,
+    ):
+        self.ttl = ttl
+        self._entries = cache.LRUCache(
+            max_entries=max_entries, is_expired=self._is_expired
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+        if path is not None:
+            self._store = cache.PersistentStore(path)
+            self._load()
+        else:
+            self._store = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            if self._is_expired(entry):
+                self.misses += 1
+                self.expired += 1
+                return None
+            self.hits += 1
+            return entry.images
+
+    def set(self, key, images):
+        images = tuple(images)
+        self._entries[key] = _CacheEntry(images, time.time() + self.ttl)
+        return images
+
+    def add(self, key, images):
+        """Store images unless they are already cached or the cache is full.
+
+        Returns the cached images, or None if the cache is full. Unlike
+        :meth:`set`, this never evicts anything and doesn't count as a
+        lookup, and ``images`` is only consumed if it is stored.
+        """
+        entry = self._entries.peek(key)
+        if entry is not None and not self._is_expired(entry):
+            return entry.images
+        if self.full:
+            return None
+        return self.set(key, images)
+
+    @property
+    def full(self):
+        max_entries = self._entries.max_entries
+        return max_entries is not None and len(self._entries) >= max_entries
+
+    def clear(self):
+        self._entries.clear()
+
+    @property
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self._entries.evictions,
+            }
+
+    def save(self):
+        if self._store is None:
+            return
+
+        items = {
+            ":".join(key): {
+                "images": [_untranslate_image(i) for i in entry.images],
+                "expires": entry.expires,
+            }
+            for key, entry in self._entries.items()
+            if not self._is_expired(entry)
+        }
+        if self._store.save(items):
+            logger.debug(f"Saved {len(items)} cached Spotify images")
+
+    def _load(self):
+        for key, data in self._store.load().items():
+            try:
+                uri_type, uri_id = key.split(":")
+                entry = _CacheEntry(
+                    tuple(_translate_image(i) for i in data["images"]),
+                    float(data["expires"]),
+                )
+            except (KeyError, TypeError, ValueError) as exc:
+                logger.debug(
+                    f"Ignoring invalid image cache entry {key!r}: {exc}"
+                )
+                continue
+            if not self._is_expired(entry):
+                self._entries[(uri_type, uri_id)] = entry
+        logger.debug(f"Loaded {len(self._entries)} cached Spotify images")
+
+    @staticmethod
+    def _is_expired(entry):
+        return entry.expires <= time.time()
+
 
-def get_images(web_client, uris):
+_cache = ImageCache()
+
+
+def configure_cache(
+    max_entries=DEFAULT_CACHE_MAX_ENTRIES, ttl=DEFAULT_CACHE_TTL, path=None
+):
+    global _cache
+    _cache = ImageCache(max_entries=max_entries, ttl=ttl, path=path)
+
+
+def save_cache():
+    _cache.save()
+
+
+def cache_stats():
+    return _cache.stats
+
+
+def get_images(web_client, uris, async_web_client=None):
+    """Look up images for the given URIs, using the cache where possible.
+
+    If an :class:`~mopidy_spotify.web.AsyncSpotifyOAuthClient` is given, the
+    Web API requests are made concurrently, bounded by its concurrency limit.
+    """
     result = {}
+    requests = []
     uri_type_getter = operator.itemgetter("type")
     uris = sorted((_parse_uri(u) for u in uris), key=uri_type_getter)
     for uri_type, group in itertools.groupby(uris, uri_type_getter):
         batch = []
         for uri in group:
-            if uri["key"] in _cache:
-                result[uri["uri"]] = _cache[uri["key"]]
+            cached = _cache.get(uri["key"])
+            if cached is not None:
+                result[uri["uri"]] = cached
             elif uri_type == "playlist":
-                result.update(_process_uri(web_client, uri))
+                requests.append((_process_playlist_uri, web_client, uri))
             else:
                 batch.append(uri)
                 if len(batch) >= _API_MAX_IDS_PER_REQUEST:
-                    result.update(_process_uris(web_client, uri_type, batch))
+                    requests.append(
+                        (_process_uris, web_client, uri_type, batch)
+                    )
                     batch = []
-        result.update(_process_uris(web_client, uri_type, batch))
+        if batch:
+            requests.append((_process_uris, web_client, uri_type, batch))
+
+    if async_web_client is not None and len(requests) > 1:
+        # Results are returned in request order, so the merged result does
+        # not depend on which request finished first.
+        responses = async_web_client.call_many(requests)
+    else:
+        responses = (func(*args) for func, *args in requests)
+
+    for images in responses:
+        result.update(images)
     return result
 
 
+def cache_playlist_images(web_playlist):
+    """Add images already included in a Web API playlist to the cache.
+
+    This covers the playlist itself and the album of each of its tracks, so
+    later image lookups for them need no further requests. Images already
+    cached are left alone, and nothing is added once the cache is full, so
+    warming up never evicts images which were actually looked up.
+    """
+    if web_playlist.get("images") is not None:
+        _warm_cache(
+            web_playlist.get("uri"),
+            (_translate_image(i) for i in web_playlist["images"]),
+        )
+
+    album_images = {}  # album URI -> (Image(), ...)
+    for item in web_playlist.get("tracks", {}).get("items", []):
+        web_track = item.get("track") or {}
+        web_album = web_track.get("album") or {}
+        if web_album.get("images") is None:
+            continue
+
+        album_uri = web_album.get("uri")
+        if album_uri not in album_images:
+            album_images[album_uri] = _warm_cache(
+                album_uri, (_translate_image(i) for i in web_album["images"])
+            )
+        images = album_images[album_uri]
+        linked_from = web_track.get("linked_from") or {}
+        for uri in (web_track.get("uri"), linked_from.get("uri")):
+            if images is None or _cache.full:
+                return
+            _warm_cache(uri, images)
+
+
+def _warm_cache(uri, images):
+    # URIs in Web API responses are always "spotify:<type>:<id>", so the
+    # much slower _parse_uri() isn't needed. Anything else, e.g. local tracks,
+    # has no Web API images.
+    parts = uri.split(":") if isinstance(uri, str) else ()
+    if (
+        len(parts) != 3
+        or parts[0] != "spotify"
+        or parts[1] not in _SUPPORTED_TYPES
+    ):
+        return tuple(images)
+    return _cache.add((parts[1], parts[2]), images)
+
+
 def _parse_uri(uri):
     parsed_uri = urllib.parse.urlparse(uri)
     uri_type, uri_id = None, None
@@ -47,8 +264,7 @@ def _parse_uri(uri):
         if parsed_uri.netloc in ("open.spotify.com", "play.spotify.com"):
             uri_type, uri_id = parsed_uri.path.split("/")[1:3]
 
-    supported_types = ("track", "album", "artist", "playlist")
-    if uri_type and uri_type in supported_types and uri_id:
+    if uri_type and uri_type in _SUPPORTED_TYPES and uri_id:
         return {
             "uri": uri,
             "type": uri_type,
@@ -59,10 +275,20 @@ def _parse_uri(uri):
     raise ValueError(f"Could not parse {repr(uri)} as a Spotify URI")
 
 
-def _process_uri(web_client, uri):
-    data = web_client.get(f"{uri['type']}s/{uri['id']}")
-    _cache[uri["key"]] = tuple(_translate_image(i) for i in data["images"])
-    return {uri["uri"]: _cache[uri["key"]]}
+def _process_playlist_uri(web_client, uri):
+    # There is no endpoint for looking up several playlists at once, but
+    # asking only for the images avoids downloading the first page of tracks,
+    # and the response is cached and revalidated using its ETag.
+    data = web_client.get_one(
+        f"playlists/{uri['id']}", params={"fields": "images"}
+    )
+    if "images" not in data:
+        return {}
+
+    images = _cache.set(
+        uri["key"], (_translate_image(i) for i in data["images"] or [])
+    )
+    return {uri["uri"]: images}
 
 
 def _process_uris(web_client, uri_type, uris):
@@ -83,22 +309,27 @@ def _process_uris(web_client, uri_type, uris):
         else:
             uri = ids_to_uris[item["id"]]
 
-        if uri["key"] not in _cache:
+        images = _cache.get(uri["key"])
+        if images is None:
             if uri_type == "track":
                 album_key = _parse_uri(item["album"]["uri"])["key"]
-                if album_key not in _cache:
-                    _cache[album_key] = tuple(
-                        _translate_image(i) for i in item["album"]["images"]
+                images = _cache.get(album_key)
+                if images is None:
+                    images = _cache.set(
+                        album_key,
+                        (_translate_image(i) for i in item["album"]["images"]),
                     )
-                _cache[uri["key"]] = _cache[album_key]
             else:
-                _cache[uri["key"]] = tuple(
-                    _translate_image(i) for i in item["images"]
-                )
-        result[uri["uri"]] = _cache[uri["key"]]
+                images = (_translate_image(i) for i in item["images"])
+            images = _cache.set(uri["key"], images)
+        result[uri["uri"]] = images
 
     return result
 
 
 def _translate_image(i):
     return models.Image(uri=i["url"], height=i["height"], width=i["width"])
+
+
+def _untranslate_image(image):
+    return {"url": image.uri, "height": image.height, "width": image.width}
@@ -32,13 +32,26 @@ class SpotifyLibraryProvider(backend.LibraryProvider):
         )
 
     def get_images(self, uris):
-        return images.get_images(self._backend._web_client, uris)
+        return images.get_images(
+            self._backend._web_client,
+            uris,
+            async_web_client=self._backend._web_client_async,
+        )
 
     def lookup(self, uri):
         return lookup.lookup(
             self._config, self._backend._session, self._backend._web_client, uri
         )
 
+    def lookup_many(self, uris):
+        return lookup.lookup_many(
+            self._config,
+            self._backend._session,
+            self._backend._web_client,
+            uris,
+            async_web_client=self._backend._web_client_async,
+        )
+
     def search(self, query=None, uris=None, exact=False):
         return search.search(
             self._config,
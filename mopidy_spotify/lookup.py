@@ -9,6 +9,12 @@ _VARIOUS_ARTISTS_URIS = [
     "spotify:artist:0LyfQWJT6nXafLPZqxe9Of",
 ]
 
+# Maximum number of IDs accepted by the Web API "several objects" endpoints.
+_API_MAX_IDS_PER_REQUEST = {
+    web.LinkType.TRACK: 50,
+    web.LinkType.ALBUM: 20,
+}
+
 
 def lookup(config, session, web_client, uri):
     try:
@@ -39,6 +45,112 @@ def lookup(config, session, web_client, uri):
         return []
 
 
+def lookup_many(config, session, web_client, uris, async_web_client=None):
+    """Look up several URIs, batching tracks and albums via the Web API.
+
+    Returns a dict mapping each URI to a list of tracks. URIs which cannot be
+    batched are looked up one by one with :func:`lookup`. If an
+    :class:`~mopidy_spotify.web.AsyncSpotifyOAuthClient` is given, the
+    batches are fetched concurrently.
+    """
+    result = {}
+    batches = {link_type: [] for link_type in _API_MAX_IDS_PER_REQUEST}
+
+    for uri in uris:
+        try:
+            web_link = web.WebLink.from_uri(uri)
+        except ValueError:
+            web_link = None
+        if (
+            web_link is not None
+            and web_link.type in batches
+            and web_client is not None
+            and web_client.logged_in
+        ):
+            batches[web_link.type].append(web_link)
+        else:
+            result[uri] = lookup(config, session, web_client, uri)
+
+    requests = []
+    for link_type, web_links in batches.items():
+        batch_size = _API_MAX_IDS_PER_REQUEST[link_type]
+        for i in range(0, len(web_links), batch_size):
+            batch = web_links[i : i + batch_size]
+            path = "tracks" if link_type == web.LinkType.TRACK else "albums"
+            params = {
+                "ids": ",".join(web_link.id for web_link in batch),
+                "market": "from_token",
+            }
+            requests.append((link_type, batch, path, params))
+
+    if async_web_client is not None and len(requests) > 1:
+        responses = async_web_client.get_many(
+            [(path, params) for _, _, path, params in requests]
+        )
+    else:
+        responses = (
+            web_client.get_one(path, params=params)
+            for _, _, path, params in requests
+        )
+
+    for (link_type, batch, _, _), data in zip(requests, responses):
+        if link_type == web.LinkType.TRACK:
+            result.update(_lookup_web_tracks(config, batch, data))
+        else:
+            result.update(_lookup_web_albums(config, web_client, batch, data))
+
+    return result
+
+
+def _lookup_web_tracks(config, web_links, data):
+    result = {web_link.uri: [] for web_link in web_links}
+    ids_to_uris = {web_link.id: web_link.uri for web_link in web_links}
+
+    for web_track in data.get("tracks", []):
+        if not web_track:
+            continue
+        # Relinked tracks must be returned under the URI that was asked for.
+        linked_from = web_track.get("linked_from", {})
+        uri = ids_to_uris.get(linked_from.get("id", web_track.get("id")))
+        track = translator.web_to_track(web_track, bitrate=config["bitrate"])
+        if uri is not None and track is not None:
+            result[uri] = [track]
+
+    return result
+
+
+def _lookup_web_albums(config, web_client, web_links, data):
+    result = {web_link.uri: [] for web_link in web_links}
+    ids_to_uris = {web_link.id: web_link.uri for web_link in web_links}
+
+    for web_album in data.get("albums", []):
+        if not web_album:
+            continue
+        uri = ids_to_uris.get(web_album.get("id"))
+        if uri is None:
+            continue
+
+        web_tracks = list(web_album.get("tracks", {}).get("items", []))
+        next_path = web_album.get("tracks", {}).get("next")
+        if next_path is not None:
+            for page in web_client.get_all(
+                next_path, params={"market": "from_token"}
+            ):
+                web_tracks += page.get("items", [])
+
+        # Album tracks are simplified track objects without the album.
+        album = {k: v for k, v in web_album.items() if k != "tracks"}
+        tracks = [
+            translator.web_to_track(
+                dict(web_track, album=album), bitrate=config["bitrate"]
+            )
+            for web_track in web_tracks
+        ]
+        result[uri] = [t for t in tracks if t is not None]
+
+    return result
+
+
 def _lookup_track(config, sp_link):
     sp_track = sp_link.as_track()
     sp_track.load(config["timeout"])
@@ -1,10 +1,15 @@
+import collections
 import functools
 import logging
 import threading
+import time
 
+import pykka
 from mopidy import audio, backend
+from mopidy.internal.gi import Gst
 
 import spotify
+from mopidy_spotify import utils
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +20,19 @@ GST_CAPS = "audio/x-raw,format=S16LE,rate=44100,channels=2,layout=interleaved"
 # Extra log level with lower importance than DEBUG=10 for noisy debug logging
 TRACE_LOG_LEVEL = 5
 
+# Cleared if the GStreamer bindings can't map buffers as writable memory
+_buffer_mapping_supported = True
+
 
 class SpotifyPlaybackProvider(backend.PlaybackProvider):
+
+    # Bounds for the appsrc queue size. The lower bound is Mopidy's default.
+    MIN_APPSRC_MAX_BYTES = 1 << 20
+    MAX_APPSRC_MAX_BYTES = 1 << 23
+
+    # Deliveries needed before the rejection rate is trusted
+    APPSRC_ADAPT_MIN_DELIVERIES = 100
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._timeout = self.backend._config["spotify"]["timeout"]
@@ -27,26 +43,38 @@ class SpotifyPlaybackProvider(backend.PlaybackProvider):
         self._push_audio_data_event = threading.Event()
         self._push_audio_data_event.set()
         self._end_of_track_event = threading.Event()
+        self._stats = PlaybackStats()
+        self._audio_feeder = AudioFeeder(self.audio, stats=self._stats)
         self._events_connected = False
+        self._prefetched = None
+        self._appsrc_max_bytes = self.MIN_APPSRC_MAX_BYTES
+        self._appsrc = None
+        self._adapted_at = (0, 0)
 
     def _connect_events(self):
         if not self._events_connected:
             self._events_connected = True
+            self._audio_feeder.start()
             self.backend._session.on(
                 spotify.SessionEvent.MUSIC_DELIVERY,
                 music_delivery_callback,
-                self.audio,
+                self._audio_feeder,
                 self._seeking_event,
                 self._push_audio_data_event,
                 self._buffer_timestamp,
+                self._stats,
             )
             self.backend._session.on(
                 spotify.SessionEvent.END_OF_TRACK,
                 end_of_track_callback,
                 self._end_of_track_event,
-                self.audio,
+                self._audio_feeder,
             )
 
+    def close(self):
+        """Stop feeding audio. Called when the backend stops."""
+        self._audio_feeder.stop()
+
     def change_track(self, track):
         self._connect_events()
 
@@ -59,26 +87,46 @@ class SpotifyPlaybackProvider(backend.PlaybackProvider):
         )
 
         need_data_callback_bound = functools.partial(
-            need_data_callback, self._push_audio_data_event
+            need_data_callback,
+            self._push_audio_data_event,
+            stats=self._stats,
+            is_starved=self._is_starved,
+            audio_feeder=self._audio_feeder,
         )
         enough_data_callback_bound = functools.partial(
-            enough_data_callback, self._push_audio_data_event
+            enough_data_callback, self._push_audio_data_event, stats=self._stats
         )
 
         seek_data_callback_bound = functools.partial(
             seek_data_callback, self._seeking_event, self.backend._actor_proxy
         )
 
+        if not self._end_of_track_event.is_set():
+            # The previous track was interrupted, so anything still queued
+            # for it must not be played. On natural track changes the queue
+            # ends with the end-of-stream marker and is left to drain.
+            self._audio_feeder.clear()
         self._buffer_timestamp.set(0)
         self._first_seek = True
         self._end_of_track_event.clear()
 
+        self._stats.track_changed()
+        started = time.monotonic()
+        sp_track = self._take_prefetched(track.uri)
+        prefetched = sp_track is not None
+
         try:
-            sp_track = self.backend._session.get_track(track.uri)
-            sp_track.load(self._timeout)
+            if sp_track is None:
+                sp_track = self.backend._session.get_track(track.uri)
+                sp_track.load(self._timeout)
             self.backend._session.player.load(sp_track)
             self.backend._session.player.play()
 
+            # Source setup callbacks were added in Mopidy 3.4. Without them
+            # the appsrc keeps Mopidy's default queue size.
+            self._appsrc = None
+            if hasattr(self.audio, "set_source_setup_callback"):
+                self.audio.set_source_setup_callback(self.on_source_setup)
             future = self.audio.set_appsrc(
                 GST_CAPS,
                 need_data=need_data_callback_bound,
@@ -91,11 +139,94 @@ class SpotifyPlaybackProvider(backend.PlaybackProvider):
             # mopidy.audio has completed before we return from change_track().
             future.get()
 
+            logger.debug(
+                f"Changed track to {track.uri} in "
+                f"{(time.monotonic() - started) * 1000:.0f}ms "
+                f"(prefetched: {prefetched})"
+            )
             return True
         except spotify.Error as exc:
             logger.info(f"Playback of {track.uri} failed: {exc}")
             return False
 
+    def prefetch(self, uri):
+        """Prepare playback of the track that is likely to be played next.
+
+        Loads the track's metadata and asks libspotify to start fetching its
+        audio, so that a later :meth:`change_track` to the same track doesn't
+        have to wait for either.
+        """
+        try:
+            sp_track = self.backend._session.get_track(uri)
+            sp_track.load(self._timeout)
+            self.backend._session.player.prefetch(sp_track)
+        except spotify.Error as exc:
+            logger.debug(f"Prefetching {uri} failed: {exc}")
+            self._prefetched = None
+            return False
+
+        logger.debug(f"Prefetching {uri}")
+        self._prefetched = (uri, sp_track)
+        return True
+
+    def on_source_setup(self, source):
+        # This is called from the audio thread, and must not block.
+        if source.get_factory().get_name() != "appsrc":
+            return
+        self._appsrc = source
+        self._appsrc_max_bytes = self._adapt_appsrc_max_bytes()
+        source.set_property("max-bytes", self._appsrc_max_bytes)
+
+    def _is_starved(self):
+        # Called from GStreamer when appsrc needs data. That happens on every
+        # refill, so it is only an underrun if nothing is queued anywhere.
+        # Without the appsrc (Mopidy < 3.4) this can't be told.
+        appsrc = self._appsrc
+        if appsrc is None or len(self._audio_feeder) > 0:
+            return False
+        return appsrc.get_property("current-level-bytes") == 0
+
+    def _adapt_appsrc_max_bytes(self):
+        # Frequent rejections mean appsrc flips between needing and having
+        # enough data, making libspotify redeliver the same audio over and
+        # over. A larger queue makes each cycle last longer.
+        accepted = self._stats.accepted_deliveries
+        rejected = self._stats.rejected_deliveries
+        last_accepted, last_rejected = self._adapted_at
+        accepted, rejected = accepted - last_accepted, rejected - last_rejected
+        if accepted + rejected < self.APPSRC_ADAPT_MIN_DELIVERIES:
+            return self._appsrc_max_bytes
+        self._adapted_at = (
+            self._stats.accepted_deliveries,
+            self._stats.rejected_deliveries,
+        )
+
+        rejection_rate = rejected / (accepted + rejected)
+        max_bytes = self._appsrc_max_bytes
+        if rejection_rate > 0.25:
+            max_bytes = min(max_bytes * 2, self.MAX_APPSRC_MAX_BYTES)
+        elif rejection_rate < 0.05:
+            max_bytes = max(max_bytes // 2, self.MIN_APPSRC_MAX_BYTES)
+        if max_bytes != self._appsrc_max_bytes:
+            logger.debug(
+                f"Audio delivery rejection rate was {rejection_rate:.0%}; "
+                f"changing appsrc queue size to {max_bytes} bytes"
+            )
+        return max_bytes
+
+    @property
+    def playback_stats(self):
+        return {
+            **self._stats.snapshot(),
+            "appsrc_max_bytes": self._appsrc_max_bytes,
+        }
+
+    def _take_prefetched(self, uri):
+        prefetched, self._prefetched = self._prefetched, None
+        if prefetched is not None and prefetched[0] == uri:
+            return prefetched[1]
+        return None
+
     def resume(self):
         logger.debug("Audio requested resume; starting Spotify player")
         self.backend._session.player.play()
@@ -104,6 +235,7 @@ class SpotifyPlaybackProvider(backend.PlaybackProvider):
     def stop(self):
         logger.debug("Audio requested stop; pausing Spotify player")
         self.backend._session.player.pause()
+        self._audio_feeder.clear()
         return super().stop()
 
     def pause(self):
@@ -120,14 +252,26 @@ class SpotifyPlaybackProvider(backend.PlaybackProvider):
             logger.debug("Skipping seek due to issue mopidy/mopidy#300")
             return
 
+        self._stats.seek_started()
+        self._audio_feeder.clear()
         self._buffer_timestamp.set(
             audio.millisecond_to_clocktime(time_position)
         )
         self.backend._session.player.seek(time_position)
 
 
-def need_data_callback(push_audio_data_event, length_hint):
+def need_data_callback(
+    push_audio_data_event,
+    length_hint,
+    stats=None,
+    is_starved=None,
+    audio_feeder=None,
+):
     # This callback is called from GStreamer/the GObject event loop.
+    if audio_feeder is not None:
+        audio_feeder.retry()
+    if stats is not None:
+        stats.need_data(starved=is_starved is not None and is_starved())
     logger.log(
         TRACE_LOG_LEVEL,
         f"Audio requested more data (hint={length_hint}); "
@@ -136,8 +280,10 @@ def need_data_callback(push_audio_data_event, length_hint):
     push_audio_data_event.set()
 
 
-def enough_data_callback(push_audio_data_event):
+def enough_data_callback(push_audio_data_event, stats=None):
     # This callback is called from GStreamer/the GObject event loop.
+    if stats is not None:
+        stats.enough_data()
     logger.log(TRACE_LOG_LEVEL, "Audio has enough data; rejecting deliveries")
     push_audio_data_event.clear()
 
@@ -158,9 +304,11 @@ def music_delivery_callback(
     seeking_event,
     push_audio_data_event,
     buffer_timestamp,
+    stats=None,
 ):
     # This is called from an internal libspotify thread.
-    # Ideally, nothing here should block.
+    # Ideally, nothing here should block. The audio actor is normally an
+    # AudioFeeder, which answers immediately.
 
     if seeking_event.is_set():
         # A seek has happened, but libspotify hasn't confirmed yet, so
@@ -169,9 +317,13 @@ def music_delivery_callback(
             # libspotify signals that it has completed the seek. We'll accept
             # the next audio data delivery.
             seeking_event.clear()
+            if stats is not None:
+                stats.seek_completed()
         return num_frames
 
     if not push_audio_data_event.is_set():
+        if stats is not None:
+            stats.delivery_rejected()
         return 0  # Reject the audio data. It will be redelivered later.
 
     if not frames:
@@ -183,20 +335,72 @@ def music_delivery_callback(
     assert known_format, "Expects 16-bit signed integer samples"
 
     duration = audio.calculate_duration(num_frames, audio_format.sample_rate)
-    buffer_ = audio.create_buffer(
-        bytes(frames), timestamp=buffer_timestamp.get(), duration=duration
+    buffer_ = create_buffer(
+        frames, timestamp=buffer_timestamp.get(), duration=duration
     )
 
-    # We must block here to know if the buffer was consumed successfully.
+    # We must wait here to know if the buffer was consumed successfully.
     consumed = audio_actor.emit_data(buffer_).get()
 
     if consumed:
         buffer_timestamp.increase(duration)
+        if stats is not None:
+            stats.delivery_accepted()
         return num_frames
     else:
+        if stats is not None:
+            stats.delivery_rejected()
         return 0
 
 
+def create_buffer(frames, timestamp, duration):
+    """Create a GStreamer buffer holding a copy of the audio frames.
+
+    The frames are copied directly from libspotify's memory into memory
+    allocated by GStreamer. If the GStreamer bindings can't map buffers for
+    writing, we fall back to :func:`mopidy.audio.create_buffer`, which copies
+    the data twice.
+    """
+    global _buffer_mapping_supported
+
+    if _buffer_mapping_supported:
+        buffer_ = Gst.Buffer.new_allocate(None, len(frames), None)
+        if _copy_into_buffer(buffer_, frames):
+            buffer_.pts = timestamp
+            buffer_.duration = duration
+            return buffer_
+        logger.debug(
+            "Writable GStreamer buffer mapping not supported; "
+            "falling back to copying audio data twice"
+        )
+        _buffer_mapping_supported = False
+
+    return audio.create_buffer(
+        bytes(frames), timestamp=timestamp, duration=duration
+    )
+
+
+def _copy_into_buffer(buffer_, frames):
+    # This runs on the libspotify thread, so any surprise from the bindings
+    # must end in the fallback rather than an exception.
+    try:
+        success, map_info = buffer_.map(Gst.MapFlags.WRITE)
+    except Exception as exc:
+        logger.debug(f"Mapping GStreamer buffer failed: {exc}")
+        return False
+    if not success:
+        return False
+    try:
+        data = map_info.data
+        # Only gst-python's overrides give us a writable view of the memory.
+        if not isinstance(data, memoryview) or data.readonly:
+            return False
+        data[:] = frames
+        return True
+    finally:
+        buffer_.unmap(map_info)
+
+
 def end_of_track_callback(session, end_of_track_event, audio_actor):
     # This callback is called from the pyspotify event loop.
 
@@ -209,20 +413,204 @@ def end_of_track_callback(session, end_of_track_event, audio_actor):
     audio_actor.emit_data(None)
 
 
+class AudioFeeder:
+    """Feeds audio buffers to the audio actor from a dedicated thread.
+
+    :meth:`emit_data` mirrors the audio actor's method, but only appends the
+    buffer to a bounded queue and returns an already completed future, so the
+    libspotify thread never waits for the audio actor. A full queue rejects
+    the buffer, causing libspotify to redeliver it later.
+
+    The audio actor rejects buffers until appsrc is set up for the track, and
+    while it is flushed after a seek. A rejected buffer is kept at the head of
+    the queue and pushed again when appsrc asks for more data, so no audio is
+    lost and the buffer timestamps stay continuous.
+    """
+
+    DEFAULT_MAX_BUFFERS = 16
+
+    # Fallback in case appsrc was already asking for data when rejecting
+    RETRY_INTERVAL = 0.5
+
+    def __init__(
+        self, audio_actor, max_buffers=DEFAULT_MAX_BUFFERS, stats=None
+    ):
+        self._audio_actor = audio_actor
+        self._max_buffers = max_buffers
+        self._stats = stats
+        # Appends and pops on a deque are atomic, so the producer side takes
+        # no locks. The event only wakes up the feeder thread.
+        self._buffers = collections.deque()
+        self._buffers_available = threading.Event()
+        self._retry = threading.Event()
+        # Only guards removing buffers, so clear() can't race with the feeder
+        # thread removing a buffer which was pushed.
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="SpotifyAudioFeeder", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._buffers_available.set()
+        self._retry.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def emit_data(self, buffer_):
+        if buffer_ is not None and len(self._buffers) >= self._max_buffers:
+            return _completed_future(False)
+        self._buffers.append(buffer_)
+        self._buffers_available.set()
+        return _completed_future(True)
+
+    def clear(self):
+        with self._lock:
+            self._buffers.clear()
+        self._retry.set()
+
+    def retry(self):
+        """Push a buffer rejected by the audio actor again."""
+        self._retry.set()
+
+    def __len__(self):
+        return len(self._buffers)
+
+    def _run(self):
+        while self._running:
+            try:
+                buffer_ = self._buffers[0]
+            except IndexError:
+                self._buffers_available.wait()
+                self._buffers_available.clear()
+                continue
+            self._retry.clear()
+            try:
+                consumed = self._audio_actor.emit_data(buffer_).get()
+            except pykka.ActorDeadError:
+                logger.debug("Audio actor is dead; stopping audio feeder")
+                return
+            if not consumed and buffer_ is not None:
+                logger.log(
+                    TRACE_LOG_LEVEL, "Audio rejected buffer; retrying later"
+                )
+                if self._stats is not None:
+                    self._stats.delivery_retried()
+                self._retry.wait(self.RETRY_INTERVAL)
+                continue
+            with self._lock:
+                if self._buffers and self._buffers[0] is buffer_:
+                    self._buffers.popleft()
+
+
+def _completed_future(value):
+    future = pykka.ThreadingFuture()
+    future.set(value)
+    return future
+
+
+class PlaybackStats:
+    """Latency histograms and counters for the audio delivery path.
+
+    Times are measured in milliseconds. Time to first audio runs from
+    :meth:`track_changed` to the first accepted delivery, and seek to resume
+    from :meth:`seek_started` until libspotify confirms the seek. An underrun
+    is counted when appsrc asks for more data after audio for the current
+    track has started flowing and all queues are empty. Retried deliveries
+    were accepted from libspotify but then rejected by the audio actor, and
+    had to be pushed again. The need/enough data signal counts show how often
+    appsrc switches between accepting and rejecting deliveries.
+    """
+
+    LATENCY_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self.time_to_first_audio = utils.Histogram(self.LATENCY_BUCKETS)
+        self.seek_to_resume = utils.Histogram(self.LATENCY_BUCKETS)
+        self.accepted_deliveries = 0
+        self.rejected_deliveries = 0
+        self.retried_deliveries = 0
+        self.need_data_signals = 0
+        self.enough_data_signals = 0
+        self.underruns = 0
+        self._track_started = None
+        self._seek_started = None
+        self._playing = False
+
+    def track_changed(self):
+        self._track_started = time.monotonic()
+        self._playing = False
+
+    def seek_started(self):
+        self._seek_started = time.monotonic()
+        self._playing = False
+
+    def seek_completed(self):
+        started, self._seek_started = self._seek_started, None
+        if started is not None:
+            self.seek_to_resume.observe(_elapsed_ms(started))
+
+    def delivery_accepted(self):
+        self.accepted_deliveries += 1
+        self._playing = True
+        started, self._track_started = self._track_started, None
+        if started is not None:
+            self.time_to_first_audio.observe(_elapsed_ms(started))
+
+    def delivery_rejected(self):
+        self.rejected_deliveries += 1
+
+    def delivery_retried(self):
+        self.retried_deliveries += 1
+
+    def need_data(self, starved=False):
+        self.need_data_signals += 1
+        if self._playing and starved:
+            self.underruns += 1
+
+    def enough_data(self):
+        self.enough_data_signals += 1
+
+    def snapshot(self):
+        return {
+            "time_to_first_audio": self.time_to_first_audio.snapshot(),
+            "seek_to_resume": self.seek_to_resume.snapshot(),
+            "accepted_deliveries": self.accepted_deliveries,
+            "rejected_deliveries": self.rejected_deliveries,
+            "retried_deliveries": self.retried_deliveries,
+            "need_data_signals": self.need_data_signals,
+            "enough_data_signals": self.enough_data_signals,
+            "underruns": self.underruns,
+        }
+
+
+def _elapsed_ms(started):
+    return (time.monotonic() - started) * 1000
+
+
 class BufferTimestamp:
-    """Wrapper around an int to serialize access by multiple threads.
+    """Wrapper around an int shared by multiple threads.
 
     The value is used both from the backend actor and callbacks called by
-    internal libspotify threads.
+    internal libspotify threads. Reading an attribute is atomic, so only
+    writers take the lock.
     """
 
     def __init__(self, value):
         self._value = value
-        self._lock = threading.RLock()
+        self._lock = threading.Lock()
 
     def get(self):
-        with self._lock:
-            return self._value
+        return self._value
 
     def set(self, value):
         with self._lock:
@@ -1,9 +1,10 @@
 import logging
+import threading
 
 from mopidy import backend
 
 import spotify
-from mopidy_spotify import translator, utils
+from mopidy_spotify import images, translator, utils
 
 _sp_links = {}
 
@@ -15,9 +16,23 @@ class SpotifyPlaylistsProvider(backend.PlaylistsProvider):
         self._backend = backend
         self._timeout = self._backend._config["spotify"]["timeout"]
         self._loaded = False
+        self._snapshot_ids = {}  # playlist URI -> snapshot_id
+        self._playlist_refs = None
+
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread = None
+        self._refresh_pending = False
+        self._refresh_progress = (0, 0)
+        self._refresh_stopped = threading.Event()
 
     def as_list(self):
         with utils.time_logger("playlists.as_list()", logging.DEBUG):
+            # Serve the playlists published by the last (or currently
+            # running) refresh, without going to the Web API.
+            playlist_refs = self._playlist_refs
+            if playlist_refs is not None:
+                return list(playlist_refs)
+
             if not self._loaded:
                 return []
 
@@ -40,29 +55,144 @@ class SpotifyPlaylistsProvider(backend.PlaylistsProvider):
         with utils.time_logger(f"playlists.lookup({uri!r})", logging.DEBUG):
             return self._get_playlist(uri)
 
-    def _get_playlist(self, uri, as_items=False):
+    def _get_playlist(self, uri, as_items=False, cache_images=False):
         return playlist_lookup(
             self._backend._session,
             self._backend._web_client,
             uri,
             self._backend._bitrate,
             as_items,
+            cache_images=cache_images,
         )
 
+    @property
+    def refreshing(self):
+        return self._refresh_thread is not None
+
+    @property
+    def refresh_progress(self):
+        """Tuple of number of playlists refreshed and total to refresh."""
+        return self._refresh_progress
+
     def refresh(self):
         if not self._backend._web_client.logged_in:
             return
 
+        # Playlists are refreshed in a background thread so the backend
+        # actor can keep serving requests in the meantime.
+        with self._refresh_lock:
+            if self._refresh_stopped.is_set():
+                return
+            if self._refresh_thread is not None:
+                self._refresh_pending = True
+                return
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_worker,
+                name="SpotifyPlaylistsRefresh",
+                daemon=True,
+            )
+            thread = self._refresh_thread
+        thread.start()
+
+    def stop_refresh(self):
+        """Stop a running refresh, and wait for it to finish.
+
+        The refresh stops before the next playlist, without publishing or
+        saving anything. No further refreshes are started.
+        """
+        with self._refresh_lock:
+            self._refresh_stopped.set()
+            self._refresh_pending = False
+            thread = self._refresh_thread
+        if thread is not None:
+            thread.join()
+
+    def _refresh_worker(self):
+        try:
+            while True:
+                self._refresh()
+                with self._refresh_lock:
+                    if not self._refresh_pending:
+                        self._refresh_thread = None
+                        break
+                    self._refresh_pending = False
+        except Exception:
+            logger.exception("Refreshing Spotify playlists failed")
+            with self._refresh_lock:
+                self._refresh_thread = None
+                self._refresh_pending = False
+
+    def _refresh(self):
         with utils.time_logger("playlists.refresh()", logging.DEBUG):
-            _sp_links.clear()
+            if not self._snapshot_ids:
+                _sp_links.clear()
             self._backend._web_client.clear_cache()
-            count = 0
-            for playlist_ref in self._get_flattened_playlist_refs():
-                self._get_playlist(playlist_ref.uri)
-                count = count + 1
+            translator.clear_caches()
+
+            web_client = self._backend._web_client
+            web_playlists = []
+            for web_playlist in web_client.get_user_playlists():
+                if self._refresh_stopped.is_set():
+                    logger.debug("Refreshing Spotify playlists stopped")
+                    return
+                images.cache_playlist_images(web_playlist)
+                playlist_ref = translator.to_playlist_ref(
+                    web_playlist, web_client.user_id
+                )
+                if playlist_ref is not None:
+                    web_playlists.append((playlist_ref, web_playlist))
+
+            previous_refs = self._playlist_refs or []
+            playlist_refs = []
+            self._refresh_progress = (0, len(web_playlists))
+
+            # Only playlists which are new or have a different snapshot_id
+            # than last time have changed and need to be fetched again.
+            snapshot_ids = {}
+            changed = 0
+            seen = set()
+            for playlist_ref, web_playlist in web_playlists:
+                if self._refresh_stopped.is_set():
+                    logger.debug("Refreshing Spotify playlists stopped")
+                    return
+                uri = playlist_ref.uri
+                snapshot_id = web_playlist.get("snapshot_id")
+                if (
+                    snapshot_id is not None
+                    and self._snapshot_ids.get(uri) == snapshot_id
+                ):
+                    snapshot_ids[uri] = snapshot_id
+                else:
+                    changed = changed + 1
+                    if self._get_playlist(uri, cache_images=True) is not None:
+                        snapshot_ids[uri] = snapshot_id
+
+                # Publish partial results, keeping playlists from the
+                # previous refresh which have not been processed yet.
+                playlist_refs.append(playlist_ref)
+                seen.add(uri)
+                self._playlist_refs = playlist_refs + [
+                    ref for ref in previous_refs if ref.uri not in seen
+                ]
+                self._refresh_progress = (
+                    len(playlist_refs),
+                    len(web_playlists),
+                )
+
+            removed = len(self._snapshot_ids.keys() - snapshot_ids.keys())
+            self._snapshot_ids = snapshot_ids
+            self._playlist_refs = playlist_refs
+            count = len(playlist_refs)
             logger.info(f"Refreshed {count} Spotify playlists")
+            logger.debug(
+                f"Fetched {changed} new or changed Spotify playlists, "
+                f"dropped {removed} removed playlists"
+            )
+            self._backend._web_client.save_cache()
+            images.save_cache()
 
         self._loaded = True
+        backend.BackendListener.send("playlists_loaded")
 
     def create(self, name):
         pass  # TODO
@@ -74,7 +204,9 @@ class SpotifyPlaylistsProvider(backend.PlaylistsProvider):
         pass  # TODO
 
 
-def playlist_lookup(session, web_client, uri, bitrate, as_items=False):
+def playlist_lookup(
+    session, web_client, uri, bitrate, as_items=False, cache_images=False
+):
     if web_client is None or not web_client.logged_in:
         return
 
@@ -85,6 +217,8 @@ def playlist_lookup(session, web_client, uri, bitrate, as_items=False):
         logger.error(f"Failed to lookup Spotify playlist URI {uri!r}")
         return
 
+    if cache_images:
+        images.cache_playlist_images(web_playlist)
     playlist = translator.to_playlist(
         web_playlist,
         username=web_client.user_id,
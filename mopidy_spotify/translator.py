@@ -1,29 +1,82 @@
-import collections
+import collections.abc
 import logging
+import threading
 
 from mopidy import models
 
 import spotify
+from mopidy_spotify import compact
 
 logger = logging.getLogger(__name__)
 
 
+CacheInfo = collections.namedtuple(
+    "CacheInfo", ["hits", "misses", "max_size", "size"]
+)
+
+
 class memoized:  # noqa N801
+    """Memoize a function in a bounded least recently used cache.
+
+    Lookups of cached values don't take any lock, only updates of the cache
+    do. Because of this, the hit count is not exact when used from several
+    threads at once.
+    """
+
+    DEFAULT_MAX_SIZE = 10000
+
+    _instances = []
+
     def __init__(self, func):
         self.func = func
-        self.cache = {}
+        self.cache = collections.OrderedDict()
+        self.max_size = self.DEFAULT_MAX_SIZE
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        memoized._instances.append(self)
 
     def __call__(self, *args, **kwargs):
         # NOTE Only args, not kwargs, are part of the memoization key.
-        if not isinstance(args, collections.abc.Hashable):
+        try:
+            value = self.cache[args]
+        except KeyError:
+            pass
+        except TypeError:  # Unhashable arguments
             return self.func(*args, **kwargs)
-        if args in self.cache:
-            return self.cache[args]
         else:
-            value = self.func(*args, **kwargs)
+            self._hits += 1
+            try:
+                self.cache.move_to_end(args)
+            except KeyError:  # Evicted by another thread
+                pass
+            return value
+
+        value = self.func(*args, **kwargs)
+        with self._lock:
+            self._misses += 1
             if value is not None:
                 self.cache[args] = value
-            return value
+                while len(self.cache) > self.max_size:
+                    self.cache.popitem(last=False)
+        return value
+
+    def cache_info(self):
+        return CacheInfo(
+            self._hits, self._misses, self.max_size, len(self.cache)
+        )
+
+    def cache_clear(self):
+        with self._lock:
+            self.cache.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+def clear_caches():
+    """Forget all memoized translations, e.g. when playlists are refreshed."""
+    for instance in memoized._instances:
+        instance.cache_clear()
 
 
 @memoized
@@ -170,7 +223,7 @@ def to_track_ref(sp_track):
 
 def valid_web_data(data, object_type):
     return (
-        isinstance(data, dict)
+        isinstance(data, collections.abc.Mapping)
         and data.get("type") == object_type
         and "uri" in data
     )
@@ -220,7 +273,7 @@ def to_playlist(
         return ref
 
     web_tracks = web_playlist.get("tracks", {}).get("items", [])
-    if as_items and not isinstance(web_tracks, list):
+    if as_items and not isinstance(web_tracks, (list, compact.TrackList)):
         return
 
     if as_items:
@@ -297,12 +350,27 @@ def _transform_year(date):
         )
 
 
+# The Web API returns the same artists and albums over and over again, e.g.
+# for every track of a playlist. These are interned by URI and the fields used
+# in the models, so identical instances are shared instead of rebuilt.
+
+
+@memoized
+def _web_to_interned_artist(uri, name):
+    return models.Artist(uri=uri, name=name)
+
+
+@memoized
+def _web_to_interned_album(uri, name, artists):
+    return models.Album(uri=uri, name=name, artists=artists)
+
+
 def web_to_artist(web_artist):
     ref = web_to_artist_ref(web_artist)
     if ref is None:
         return
 
-    return models.Artist(uri=ref.uri, name=ref.name)
+    return _web_to_interned_artist(ref.uri, ref.name)
 
 
 def web_to_album(web_album):
@@ -313,9 +381,9 @@ def web_to_album(web_album):
     artists = [
         web_to_artist(web_artist) for web_artist in web_album.get("artists", [])
     ]
-    artists = [a for a in artists if a]
+    artists = tuple(a for a in artists if a)
 
-    return models.Album(uri=ref.uri, name=ref.name, artists=artists)
+    return _web_to_interned_album(ref.uri, ref.name, artists)
 
 
 def web_to_track(web_track, bitrate=None):
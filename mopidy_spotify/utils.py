@@ -1,9 +1,12 @@
+import bisect
 import contextlib
 import logging
+import threading
 import time
 
 import requests
 from mopidy import httpclient
+from urllib3 import connection, connectionpool
 
 from mopidy_spotify import Extension, __version__
 
@@ -11,7 +14,11 @@ logger = logging.getLogger(__name__)
 TRACE = logging.getLevelName("TRACE")
 
 
-def get_requests_session(proxy_config):
+def get_requests_session(
+    proxy_config,
+    pool_connections=requests.adapters.DEFAULT_POOLSIZE,
+    pool_maxsize=requests.adapters.DEFAULT_POOLSIZE,
+):
     user_agent = f"{Extension.dist_name}/{__version__}"
     proxy = httpclient.format_proxy(proxy_config)
     full_user_agent = httpclient.format_user_agent(user_agent)
@@ -20,9 +27,124 @@ def get_requests_session(proxy_config):
     session.proxies.update({"http": proxy, "https": proxy})
     session.headers.update({"user-agent": full_user_agent})
 
+    # Retries are handled by the callers, who know what is safe to retry.
+    adapter = InstrumentedHTTPAdapter(
+        pool_connections=pool_connections, pool_maxsize=pool_maxsize
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
     return session
 
 
+class ConnectionStats:
+    """Counts requests and new connections made through an HTTP adapter.
+
+    Requests that did not need a new connection reused a kept-alive one.
+    Connect and TLS handshake times are in milliseconds.
+    """
+
+    TIME_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.connect_time = Histogram(self.TIME_BUCKETS)
+        self.tls_handshake_time = Histogram(self.TIME_BUCKETS)
+        self._lock = threading.Lock()
+
+    def request_sent(self):
+        with self._lock:
+            self.requests += 1
+
+    def connection_made(self, connect_time, tls_handshake_time=None):
+        with self._lock:
+            self.new_connections += 1
+        self.connect_time.observe(connect_time)
+        if tls_handshake_time is not None:
+            self.tls_handshake_time.observe(tls_handshake_time)
+
+    def snapshot(self):
+        with self._lock:
+            requests_sent, new_connections = self.requests, self.new_connections
+        return {
+            "requests": requests_sent,
+            "new_connections": new_connections,
+            "reused_connections": max(requests_sent - new_connections, 0),
+            "connect_time": self.connect_time.snapshot(),
+            "tls_handshake_time": self.tls_handshake_time.snapshot(),
+        }
+
+
+class _TimedConnectionMixin:
+    connection_stats = None
+    is_tls = False
+
+    def _new_conn(self):
+        started = time.monotonic()
+        try:
+            return super()._new_conn()
+        finally:
+            self._tcp_connect_time = time.monotonic() - started
+
+    def connect(self):
+        self._tcp_connect_time = None
+        started = time.monotonic()
+        super().connect()
+        total = time.monotonic() - started
+        tcp = self._tcp_connect_time
+        if tcp is None:
+            tcp = total
+        tls = (total - tcp) * 1000 if self.is_tls else None
+        self.connection_stats.connection_made(tcp * 1000, tls)
+
+
+def _instrumented_pool_classes(stats):
+    class HTTPConnection(_TimedConnectionMixin, connection.HTTPConnection):
+        connection_stats = stats
+
+    class HTTPSConnection(_TimedConnectionMixin, connection.HTTPSConnection):
+        connection_stats = stats
+        is_tls = True
+
+    class HTTPConnectionPool(connectionpool.HTTPConnectionPool):
+        ConnectionCls = HTTPConnection
+
+    class HTTPSConnectionPool(connectionpool.HTTPSConnectionPool):
+        ConnectionCls = HTTPSConnection
+
+    return {"http": HTTPConnectionPool, "https": HTTPSConnectionPool}
+
+
+class InstrumentedHTTPAdapter(requests.adapters.HTTPAdapter):
+    """HTTP adapter without retries which records :class:`ConnectionStats`."""
+
+    def __init__(self, pool_connections, pool_maxsize):
+        self.stats = ConnectionStats()
+        self._pool_classes = _instrumented_pool_classes(self.stats)
+        super().__init__(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=0,
+        )
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = self._pool_classes
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        is_new = proxy not in self.proxy_manager
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        # SOCKS proxies use their own connection classes.
+        if is_new and not proxy.lower().startswith("socks"):
+            manager.pool_classes_by_scheme = self._pool_classes
+        return manager
+
+    def send(self, request, *args, **kwargs):
+        self.stats.request_sent()
+        return super().send(request, *args, **kwargs)
+
+
 @contextlib.contextmanager
 def time_logger(name, level=TRACE):
     start = time.time()
@@ -33,3 +155,34 @@ def time_logger(name, level=TRACE):
 
 def flatten(list_of_lists):
     return [item for sublist in list_of_lists for item in sublist]
+
+
+class Histogram:
+    """Distribution of observed values over fixed, sorted bucket bounds.
+
+    :meth:`snapshot` returns cumulative bucket counts, like Prometheus
+    histograms, so it can be handed to a metrics scraper as is.
+    """
+
+    def __init__(self, bounds):
+        self.bounds = tuple(sorted(bounds))
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._sum = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        buckets = []
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), counts):
+            cumulative += count
+            buckets.append((bound, cumulative))
+        return {"buckets": buckets, "count": cumulative, "sum": total}
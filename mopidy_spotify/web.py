@@ -1,8 +1,12 @@
+import asyncio
+import concurrent.futures
 import copy
 import email
+import functools
 import logging
 import os
 import re
+import threading
 import time
 import urllib.parse
 from dataclasses import dataclass
@@ -12,7 +16,7 @@ from typing import Optional
 
 import requests
 
-from mopidy_spotify import utils
+from mopidy_spotify import cache, compact, utils
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +25,80 @@ def _trace(*args, **kwargs):
     logger.log(utils.TRACE, *args, **kwargs)
 
 
+def _memoised(func, *args):
+    # Unhashable arguments, e.g. lists as query parameter values, are rare
+    # enough to just skip the cache.
+    try:
+        return func(*args)
+    except TypeError:
+        return func.__wrapped__(*args)
+
+
+@functools.lru_cache(maxsize=1024)
+def _prepare_url(base_url, url, extra_query):
+    b = urllib.parse.urlsplit(base_url)
+    u = urllib.parse.urlsplit(url)
+
+    if u.scheme or u.netloc:
+        scheme, netloc, path = u.scheme, u.netloc, u.path
+        query = urllib.parse.parse_qsl(u.query, keep_blank_values=True)
+    else:
+        scheme, netloc = b.scheme, b.netloc
+        path = os.path.normpath(os.path.join(b.path, u.path))
+        query = urllib.parse.parse_qsl(b.query, keep_blank_values=True)
+        query.extend(urllib.parse.parse_qsl(u.query, keep_blank_values=True))
+
+    query.extend(extra_query)
+
+    encoded_query = urllib.parse.urlencode(dict(query))
+    return urllib.parse.urlunsplit((scheme, netloc, path, encoded_query, ""))
+
+
+@functools.lru_cache(maxsize=1024)
+def _normalise_query_string(url, params):
+    u = urllib.parse.urlsplit(url)
+    scheme, netloc, path = u.scheme, u.netloc, u.path
+
+    query = dict(urllib.parse.parse_qsl(u.query, keep_blank_values=True))
+    query.update(params)
+    sorted_unique_query = sorted(query.items())
+    encoded_query = urllib.parse.urlencode(sorted_unique_query)
+    return urllib.parse.urlunsplit((scheme, netloc, path, encoded_query, ""))
+
+
+def _get_page_paths(page):
+    """Compute the paths of all remaining pages after ``page``.
+
+    This is only possible when the page includes the total number of
+    items and its ``next`` link uses offset based pagination.
+    """
+    total = page.get("total")
+    next_path = page.get("next")
+    if not isinstance(total, int) or not next_path:
+        return []
+
+    u = urllib.parse.urlsplit(next_path)
+    query = dict(urllib.parse.parse_qsl(u.query, keep_blank_values=True))
+    try:
+        offset = int(query["offset"])
+        limit = int(query["limit"])
+    except (KeyError, ValueError):
+        return []
+    if limit <= 0:
+        return []
+
+    paths = []
+    for page_offset in range(offset, total, limit):
+        query["offset"] = page_offset
+        encoded_query = urllib.parse.urlencode(query)
+        paths.append(
+            urllib.parse.urlunsplit(
+                (u.scheme, u.netloc, u.path, encoded_query, "")
+            )
+        )
+    return paths
+
+
 class OAuthTokenRefreshError(Exception):
     def __init__(self, reason):
         message = f"OAuth token refresh failed: {reason}"
@@ -31,6 +109,87 @@ class OAuthClientError(Exception):
     pass
 
 
+class RateLimiter:
+    """Token bucket limiting the rate of requests across all threads.
+
+    Besides the steady rate, a shared cooldown can be set, e.g. from a
+    ``Retry-After`` header, which pauses all callers until it has passed.
+    """
+
+    def __init__(self, rate=None, burst=1):
+        self._rate = rate
+        self._burst = max(burst, 1)
+        self._tokens = float(self._burst)
+        self._updated = time.monotonic()
+        self._cooldown_until = 0.0
+        self._lock = threading.Lock()
+
+        self.throttled_count = 0
+        self.throttled_time = 0.0
+
+    def _refill(self, now):
+        if self._rate is not None:
+            elapsed = now - self._updated
+            self._tokens = min(self._burst, self._tokens + elapsed * self._rate)
+        self._updated = now
+
+    def _get_wait_time(self, now):
+        if now < self._cooldown_until:
+            return self._cooldown_until - now
+        elif self._rate is None or self._tokens >= 1:
+            return 0
+        else:
+            return (1 - self._tokens) / self._rate
+
+    def acquire(self, timeout=None):
+        """Block until a request may be made.
+
+        Returns :class:`False` if that would take longer than ``timeout``.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait_time = self._get_wait_time(now)
+                if wait_time <= 0:
+                    if self._rate is not None:
+                        self._tokens -= 1
+                    if waited > 0:
+                        self.throttled_count += 1
+                        self.throttled_time += waited
+                    return True
+
+            if timeout is not None and waited + wait_time > timeout:
+                return False
+            _trace(f"Rate limited, waiting {wait_time:.3f} seconds.")
+            time.sleep(wait_time)
+            waited += wait_time
+
+    def cooldown(self, seconds):
+        with self._lock:
+            self._cooldown_until = max(
+                self._cooldown_until, time.monotonic() + seconds
+            )
+
+    @property
+    def budget(self):
+        with self._lock:
+            now = time.monotonic()
+            if now < self._cooldown_until:
+                return 0.0
+            self._refill(now)
+            return float("inf") if self._rate is None else self._tokens
+
+    @property
+    def stats(self):
+        return {
+            "budget": self.budget,
+            "throttled_count": self.throttled_count,
+            "throttled_time": self.throttled_time,
+        }
+
+
 class OAuthClient:
     def __init__(
         self,
@@ -43,6 +202,9 @@ class OAuthClient:
         timeout=10,
         retries=3,
         retry_statuses=(500, 502, 503, 429),
+        rate_limit=None,
+        rate_limit_burst=1,
+        max_connections=requests.adapters.DEFAULT_POOLSIZE,
     ):
 
         if client_id and client_secret:
@@ -61,9 +223,15 @@ class OAuthClient:
         self._number_of_retries = retries
         self._retry_statuses = retry_statuses
         self._backoff_factor = 0.5
+        self._rate_limiter = RateLimiter(rate_limit, rate_limit_burst)
 
         self._headers = {"Content-Type": "application/json"}
-        self._session = utils.get_requests_session(proxy_config or {})
+        self._session = utils.get_requests_session(
+            proxy_config or {}, pool_maxsize=max_connections
+        )
+        self._token_lock = threading.Lock()
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
 
     def get(self, path, cache=None, *args, **kwargs):
         if self._authorization_failed:
@@ -76,17 +244,46 @@ class OAuthClient:
         _trace(f"Get '{path}'")
 
         ignore_expiry = kwargs.pop("ignore_expiry", False)
-        if cache is not None and path in cache:
-            cached_result = cache.get(path)
+        extra_expiry = kwargs.pop("extra_expiry", 0)
+        cached_result = cache.get(path) if cache is not None else None
+        if cached_result is not None:
             if cached_result.still_valid(ignore_expiry):
                 return cached_result
             kwargs.setdefault("headers", {}).update(cached_result.etag_headers)
 
+        # Concurrent callers asking for the same path share a single request.
+        with self._in_flight_lock:
+            in_flight = self._in_flight.get(path)
+            is_leader = in_flight is None
+            if is_leader:
+                in_flight = concurrent.futures.Future()
+                self._in_flight[path] = in_flight
+
+        if not is_leader:
+            _trace(f"Waiting for in-flight request for '{path}'")
+            return in_flight.result()
+
+        try:
+            result = self._fetch(path, cache, cached_result, *args, **kwargs)
+            # Only here, as the result is shared with all waiting callers.
+            result.increase_expiry(extra_expiry)
+        except Exception as exc:
+            in_flight.set_exception(exc)
+            raise
+        else:
+            in_flight.set_result(result)
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[path]
+        return result
+
+    def _fetch(self, path, cache, cached_result, *args, **kwargs):
         # TODO: Factor this out once we add more methods.
         # TODO: Don't silently error out.
         try:
-            if self._should_refresh_token():
-                self._refresh_token()
+            with self._token_lock:
+                if self._should_refresh_token():
+                    self._refresh_token()
         except OAuthTokenRefreshError as e:
             logger.error(e)
             return WebResponse(None, None)
@@ -103,9 +300,8 @@ class OAuthClient:
             return WebResponse(None, None)
 
         if self._should_cache_response(cache, result):
-            previous_result = cache.get(path)
-            if previous_result and previous_result.updated(result):
-                result = previous_result
+            if cached_result and cached_result.updated(result):
+                result = cached_result
             cache[path] = result
 
         return result
@@ -156,6 +352,7 @@ class OAuthClient:
         try_until = time.time() + self._timeout
 
         result = None
+        status_code = None
         backoff_time = 0
 
         for i in range(self._number_of_retries):
@@ -167,6 +364,10 @@ class OAuthClient:
             elif backoff_time > 0:
                 time.sleep(backoff_time)
 
+            if not self._rate_limiter.acquire(timeout=remaining_timeout):
+                logger.debug(f"Fetching {prepared_request.url} rate limited")
+                break
+
             try:
                 response = self._session.send(
                     prepared_request, timeout=remaining_timeout
@@ -181,6 +382,10 @@ class OAuthClient:
                 backoff_time = self._parse_retry_after(response)
                 result = WebResponse.from_requests(prepared_request, response)
 
+            if status_code == 429 and backoff_time:
+                # Make all other requests wait for the same amount of time.
+                self._rate_limiter.cooldown(backoff_time)
+
             if status_code and 400 <= status_code < 600:
                 logger.debug(
                     f"Fetching {prepared_request.url} failed: {status_code}"
@@ -214,40 +419,25 @@ class OAuthClient:
 
     def _prepare_url(self, url, *args, **kwargs):
         # TODO: Move this out as a helper and unit-test it directly?
-        b = urllib.parse.urlsplit(self._base_url)
-        u = urllib.parse.urlsplit(url.format(*args))
-
-        if u.scheme or u.netloc:
-            scheme, netloc, path = u.scheme, u.netloc, u.path
-            query = urllib.parse.parse_qsl(u.query, keep_blank_values=True)
-        else:
-            scheme, netloc = b.scheme, b.netloc
-            path = os.path.normpath(os.path.join(b.path, u.path))
-            query = urllib.parse.parse_qsl(b.query, keep_blank_values=True)
-            query.extend(
-                urllib.parse.parse_qsl(u.query, keep_blank_values=True)
-            )
-
-        for key, value in kwargs.items():
-            query.append((key, value))
-
-        encoded_query = urllib.parse.urlencode(dict(query))
-        return urllib.parse.urlunsplit(
-            (scheme, netloc, path, encoded_query, "")
+        return _memoised(
+            _prepare_url,
+            self._base_url,
+            url.format(*args),
+            tuple(kwargs.items()),
         )
 
     def _normalise_query_string(self, url, params=None):
-        u = urllib.parse.urlsplit(url)
-        scheme, netloc, path = u.scheme, u.netloc, u.path
+        params = tuple(params.items()) if isinstance(params, dict) else ()
+        return _memoised(_normalise_query_string, url, params)
 
-        query = dict(urllib.parse.parse_qsl(u.query, keep_blank_values=True))
-        if isinstance(params, dict):
-            query.update(params)
-        sorted_unique_query = sorted(query.items())
-        encoded_query = urllib.parse.urlencode(sorted_unique_query)
-        return urllib.parse.urlunsplit(
-            (scheme, netloc, path, encoded_query, "")
-        )
+    @property
+    def rate_limit_stats(self):
+        return self._rate_limiter.stats
+
+    @property
+    def connection_stats(self):
+        adapter = self._session.get_adapter(self._base_url)
+        return adapter.stats.snapshot()
 
     def _parse_retry_after(self, response):
         """Parse Retry-After header from response if it is set."""
@@ -270,6 +460,7 @@ class WebResponse(dict):
     def __init__(self, url, data, expires=0.0, etag=None, status_code=400):
         self._from_cache = False
         self.url = url
+        self.size = 0
         self._expires = expires
         self._etag = etag
         self._status_code = status_code
@@ -281,7 +472,9 @@ class WebResponse(dict):
         expires = cls._parse_cache_control(response)
         etag = cls._parse_etag(response)
         json = cls._decode(response)
-        return cls(request.url, json, expires, etag, response.status_code)
+        result = cls(request.url, json, expires, etag, response.status_code)
+        result.size = len(response.content or b"")
+        return result
 
     @staticmethod
     def _decode(response):
@@ -342,6 +535,10 @@ class WebResponse(dict):
     def status_unchanged(self):
         return self._from_cache or 304 == self._status_code
 
+    @property
+    def reusable(self):
+        return self._expires >= time.time() or self._etag is not None
+
     @property
     def status_ok(self):
         return self._status_code >= 200 and self._status_code < 400
@@ -384,35 +581,133 @@ class WebResponse(dict):
         if self.status_ok and not self._from_cache:
             self._expires += delta_seconds
 
+    def expire(self):
+        self._expires = 0
+
+    def as_dict(self):
+        return {
+            "url": self.url,
+            "data": dict(self),
+            "expires": self._expires,
+            "etag": self._etag,
+            "status_code": self._status_code,
+            "size": self.size,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        result = cls(
+            data["url"],
+            data["data"],
+            expires=data["expires"],
+            etag=data["etag"],
+            status_code=data["status_code"],
+        )
+        result.size = data.get("size", 0)
+        return result
+
 
 class SpotifyOAuthClient(OAuthClient):
 
     TRACK_FIELDS = (
-        "next,items(track(type,uri,name,duration_ms,disc_number,track_number,"
-        "artists,album,is_playable,linked_from.uri))"
+        "next,total,items(track(type,uri,name,duration_ms,disc_number,"
+        "track_number,artists,album,is_playable,linked_from.uri))"
     )
     PLAYLIST_FIELDS = (
         f"name,owner.id,type,uri,snapshot_id,tracks({TRACK_FIELDS}),"
     )
     DEFAULT_EXTRA_EXPIRY = 10
 
-    def __init__(self, *, client_id, client_secret, proxy_config):
+    DEFAULT_BASE_URL = "https://api.spotify.com/v1"
+    DEFAULT_REFRESH_URL = "https://auth.mopidy.com/spotify/token"
+
+    # By default there is no steady rate limit, only the shared cooldown when
+    # Spotify responds with 429 Too Many Requests.
+    DEFAULT_RATE_LIMIT = None
+    DEFAULT_RATE_LIMIT_BURST = 20
+    DEFAULT_PAGE_WORKERS = 4
+    DEFAULT_CACHE_MAX_ENTRIES = 10000
+    DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(
+        self,
+        *,
+        client_id,
+        client_secret,
+        proxy_config,
+        base_url=None,
+        refresh_url=None,
+        max_connections=requests.adapters.DEFAULT_POOLSIZE,
+        rate_limit=DEFAULT_RATE_LIMIT,
+        rate_limit_burst=DEFAULT_RATE_LIMIT_BURST,
+        cache_path=None,
+        cache_max_entries=DEFAULT_CACHE_MAX_ENTRIES,
+        cache_max_bytes=DEFAULT_CACHE_MAX_BYTES,
+        page_workers=DEFAULT_PAGE_WORKERS,
+    ):
         super().__init__(
-            base_url="https://api.spotify.com/v1",
-            refresh_url="https://auth.mopidy.com/spotify/token",
+            base_url=base_url or self.DEFAULT_BASE_URL,
+            refresh_url=refresh_url or self.DEFAULT_REFRESH_URL,
             client_id=client_id,
             client_secret=client_secret,
             proxy_config=proxy_config,
+            rate_limit=rate_limit,
+            rate_limit_burst=rate_limit_burst,
+            max_connections=max_connections,
         )
         self.user_id = None
-        self._cache = {}
+        self._cache = cache.LRUCache(
+            max_entries=cache_max_entries,
+            max_bytes=cache_max_bytes,
+            sizeof=lambda response: response.size,
+            is_expired=lambda response: not response.reusable,
+        )
         self._extra_expiry = self.DEFAULT_EXTRA_EXPIRY
+        self._page_workers = page_workers
+        self._page_executor = None
+        self._page_executor_lock = threading.Lock()
+
+        if cache_path is not None:
+            self._cache_store = cache.PersistentStore(
+                cache_path,
+                default=compact.to_json,
+                object_hook=compact.from_json,
+            )
+            self._load_cache()
+        else:
+            self._cache_store = None
+
+    def _load_cache(self):
+        for path, data in self._cache_store.load().items():
+            try:
+                self._cache[path] = WebResponse.from_dict(data)
+            except (KeyError, TypeError) as exc:
+                logger.debug(f"Ignoring invalid cache entry {path!r}: {exc}")
+        logger.debug(f"Loaded {len(self._cache)} cached Web API responses")
+
+    def save_cache(self):
+        if self._cache_store is None:
+            return
+
+        # Only responses with an ETag are worth keeping across restarts, as
+        # they can be revalidated with a cheap conditional request.
+        items = {
+            path: response.as_dict()
+            for path, response in list(self._cache.items())
+            if response.status_ok and response.etag_headers
+        }
+        if self._cache_store.save(items):
+            logger.debug(f"Saved {len(items)} cached Web API responses")
 
     def get_one(self, path, *args, **kwargs):
         _trace(f"Fetching page {path!r}")
-        result = self.get(path, cache=self._cache, *args, **kwargs)
-        result.increase_expiry(self._extra_expiry)
-        return result
+        return self.get(
+            path,
+            cache=self._cache,
+            extra_expiry=self._extra_expiry,
+            *args,
+            **kwargs,
+        )
 
     def get_all(self, path, *args, **kwargs):
         while path is not None:
@@ -420,6 +715,43 @@ class SpotifyOAuthClient(OAuthClient):
             path = result.get("next")
             yield result
 
+            if self._page_workers <= 1:
+                continue
+            page_paths = _get_page_paths(result)
+            if page_paths:
+                yield from self._get_pages(page_paths, *args, **kwargs)
+                return
+
+    def _get_page_executor(self):
+        with self._page_executor_lock:
+            if self._page_executor is None:
+                self._page_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self._page_workers,
+                    thread_name_prefix="SpotifyWebPages",
+                )
+            return self._page_executor
+
+    def _get_pages(self, paths, *args, **kwargs):
+        executor = self._get_page_executor()
+
+        _trace(f"Fetching {len(paths)} pages concurrently")
+        futures = [
+            executor.submit(self.get_one, path, *args, **kwargs)
+            for path in paths
+        ]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def close(self):
+        with self._page_executor_lock:
+            if self._page_executor is not None:
+                self._page_executor.shutdown(wait=False)
+                self._page_executor = None
+
     def login(self):
         self.user_id = self.get("me").get("id")
         if self.user_id is None:
@@ -454,7 +786,14 @@ class SpotifyOAuthClient(OAuthClient):
             params={"fields": self.PLAYLIST_FIELDS, "market": "from_token"},
         )
 
-        tracks_path = playlist.get("tracks", {}).get("next")
+        # The cached responses keep compact track records instead of the
+        # decoded JSON, which repeats full album and artist objects for every
+        # track.
+        tracks = playlist.get("tracks", {})
+        if isinstance(tracks.get("items"), list):
+            tracks["items"] = compact.TrackList.from_items(tracks["items"])
+
+        tracks_path = tracks.get("next")
         track_pages = self.get_all(
             tracks_path,
             params={"fields": self.TRACK_FIELDS, "market": "from_token"},
@@ -465,17 +804,161 @@ class SpotifyOAuthClient(OAuthClient):
         for page in track_pages:
             if "items" not in page:
                 return {}
-            more_tracks += page.get("items", [])
+            if isinstance(page["items"], list):
+                page["items"] = compact.TrackList.from_items(page["items"])
+            more_tracks.append(page["items"])
         if more_tracks:
-            # Take a copy to avoid changing the cached response.
-            playlist = copy.deepcopy(playlist)
-            playlist.setdefault("tracks", {}).setdefault("items", [])
-            playlist["tracks"]["items"] += more_tracks
+            # Copy the containers to avoid changing the cached response. The
+            # track records are immutable, so they can be shared.
+            playlist = copy.copy(playlist)
+            playlist["tracks"] = dict(
+                tracks,
+                items=compact.TrackList.join(
+                    [tracks.get("items", []), *more_tracks]
+                ),
+            )
 
         return playlist
 
+    @property
+    def cache_stats(self):
+        return self._cache.stats
+
     def clear_cache(self, extra_expiry=None):
-        self._cache.clear()
+        # Responses with an ETag are kept, but expired, so the next request
+        # revalidates them instead of downloading the full payload again.
+        for path, response in list(self._cache.items()):
+            if response.etag_headers:
+                response.expire()
+            else:
+                del self._cache[path]
+
+
+class AsyncSpotifyOAuthClient:
+    """Asyncio front end for a :class:`SpotifyOAuthClient`.
+
+    Coroutines run on an event loop in a dedicated thread. As ``requests`` is
+    blocking, the HTTP requests themselves run in a thread pool, with a
+    semaphore bounding how many are in flight. Token refresh, caching and
+    rate limiting are shared with the wrapped client.
+
+    Actors use the blocking :meth:`run`, :meth:`get_many` and
+    :meth:`call_many` methods, which
+    must not be called from the event loop thread itself.
+    """
+
+    # Matches the default size of the requests connection pool.
+    DEFAULT_MAX_CONCURRENCY = requests.adapters.DEFAULT_POOLSIZE
+
+    def __init__(self, web_client, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        self._web_client = web_client
+        self._max_concurrency = max_concurrency
+        self._loop = None
+        self._thread = None
+        self._executor = None
+        self._semaphore = None
+        self._start_lock = threading.Lock()
+
+    def _start(self):
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._max_concurrency,
+                thread_name_prefix="SpotifyWebAsync",
+            )
+            loop.set_default_executor(self._executor)
+            started = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                self._semaphore = asyncio.Semaphore(self._max_concurrency)
+                loop.call_soon(started.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(
+                target=run_loop, name="SpotifyWebAsyncLoop", daemon=True
+            )
+            self._thread.start()
+            started.wait()
+            self._loop = loop
+
+    def close(self):
+        with self._start_lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._executor.shutdown(wait=False)
+            self._loop = None
+
+    def run(self, coro, timeout=None):
+        """Run ``coro`` on the event loop and wait for its result."""
+        self._start()
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return future.result(timeout)
+
+    def get_many(self, paths, timeout=None):
+        """Fetch ``(path, params)`` pairs concurrently.
+
+        Returns the responses in the same order as the paths.
+        """
+
+        async def gather():
+            return await asyncio.gather(
+                *(self.get_one(path, params=params) for path, params in paths)
+            )
+
+        return self.run(gather(), timeout)
+
+    def call_many(self, calls, timeout=None):
+        """Run ``(func, *args)`` calls concurrently in the thread pool.
+
+        Returns the results in the same order as the calls.
+        """
+
+        async def gather():
+            return await asyncio.gather(*(self._call(*call) for call in calls))
+
+        return self.run(gather(), timeout)
+
+    async def _call(self, func, *args, **kwargs):
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, functools.partial(func, *args, **kwargs)
+            )
+
+    async def get(self, path, *args, **kwargs):
+        return await self._call(self._web_client.get, path, *args, **kwargs)
+
+    async def get_one(self, path, *args, **kwargs):
+        return await self._call(self._web_client.get_one, path, *args, **kwargs)
+
+    async def get_all(self, path, *args, **kwargs):
+        while path is not None:
+            result = await self.get_one(path, *args, **kwargs)
+            path = result.get("next")
+            yield result
+
+            page_paths = _get_page_paths(result)
+            if page_paths:
+                pages = [
+                    asyncio.ensure_future(self.get_one(p, *args, **kwargs))
+                    for p in page_paths
+                ]
+                try:
+                    for page in pages:
+                        yield await page
+                finally:
+                    for page in pages:
+                        page.cancel()
+                return
+
+    async def get_playlist(self, uri):
+        return await self._call(self._web_client.get_playlist, uri)
 
 
 @unique
@@ -30,6 +30,15 @@ def config(tmp_path):
             "private_session": False,
             "timeout": 10,
             "allow_cache": True,
+            "web_cache_max_entries": 10000,
+            "web_cache_max_megabytes": 256,
+            "image_cache_max_entries": 50000,
+            "image_cache_ttl": 604800,
+            "web_api_base_url": None,
+            "web_api_token_url": None,
+            "web_api_max_connections": 10,
+            "web_api_rate_limit": None,
+            "web_api_rate_limit_burst": 20,
             "allow_network": True,
             "allow_playlists": True,
             "search_album_count": 20,
@@ -414,6 +423,7 @@ def backend_mock(session_mock, config, web_client_mock):
     backend_mock._session = session_mock
     backend_mock._bitrate = 160
     backend_mock._web_client = web_client_mock
+    backend_mock._web_client_async = None
     return backend_mock
 
 
@@ -4,7 +4,7 @@ from unittest import mock
 from mopidy import backend as backend_api
 
 import spotify
-from mopidy_spotify import backend, library, playback, playlists
+from mopidy_spotify import backend, images, library, playback, playlists
 
 
 def get_backend(config, session_mock=None):
@@ -119,6 +119,14 @@ def test_on_start_configures_proxy(spotify_mock, web_mock, config):
         client_id=mock.ANY,
         client_secret=mock.ANY,
         proxy_config=config["proxy"],
+        base_url=mock.ANY,
+        refresh_url=mock.ANY,
+        max_connections=mock.ANY,
+        rate_limit=mock.ANY,
+        rate_limit_burst=mock.ANY,
+        cache_path=mock.ANY,
+        cache_max_entries=mock.ANY,
+        cache_max_bytes=mock.ANY,
     )
 
 
@@ -133,6 +141,155 @@ def test_on_start_configures_web_client(spotify_mock, web_mock, config):
         client_id="1234567",
         client_secret="AbCdEfG",
         proxy_config=mock.ANY,
+        base_url=mock.ANY,
+        refresh_url=mock.ANY,
+        max_connections=mock.ANY,
+        rate_limit=mock.ANY,
+        rate_limit_burst=mock.ANY,
+        cache_path=mock.ANY,
+        cache_max_entries=mock.ANY,
+        cache_max_bytes=mock.ANY,
+    )
+
+
+def test_on_start_configures_web_client_cache(
+    tmp_path, spotify_mock, web_mock, config
+):
+    backend = get_backend(config)
+    backend.on_start()
+
+    web_mock.SpotifyOAuthClient.assert_called_once_with(
+        client_id=mock.ANY,
+        client_secret=mock.ANY,
+        proxy_config=mock.ANY,
+        base_url=mock.ANY,
+        refresh_url=mock.ANY,
+        max_connections=mock.ANY,
+        rate_limit=mock.ANY,
+        rate_limit_burst=mock.ANY,
+        cache_path=tmp_path / "cache" / "spotify" / "web_cache.db",
+        cache_max_entries=mock.ANY,
+        cache_max_bytes=mock.ANY,
+    )
+
+
+def test_on_start_configures_image_cache(tmp_path, spotify_mock, config):
+    backend = get_backend(config)
+
+    with mock.patch.object(images, "configure_cache") as configure_mock:
+        backend.on_start()
+
+    configure_mock.assert_called_once_with(
+        max_entries=50000,
+        ttl=604800,
+        path=tmp_path / "cache" / "spotify" / "image_cache.db",
+    )
+
+
+def test_on_start_disables_image_cache_persistence_if_not_allowed(
+    spotify_mock, config
+):
+    config["spotify"]["allow_cache"] = False
+    backend = get_backend(config)
+
+    with mock.patch.object(images, "configure_cache") as configure_mock:
+        backend.on_start()
+
+    configure_mock.assert_called_once_with(
+        max_entries=mock.ANY, ttl=mock.ANY, path=None
+    )
+
+
+def test_on_start_disables_web_client_cache_if_not_allowed(
+    spotify_mock, web_mock, config
+):
+    config["spotify"]["allow_cache"] = False
+
+    backend = get_backend(config)
+    backend.on_start()
+
+    web_mock.SpotifyOAuthClient.assert_called_once_with(
+        client_id=mock.ANY,
+        client_secret=mock.ANY,
+        proxy_config=mock.ANY,
+        base_url=mock.ANY,
+        refresh_url=mock.ANY,
+        max_connections=mock.ANY,
+        rate_limit=mock.ANY,
+        rate_limit_burst=mock.ANY,
+        cache_path=None,
+        cache_max_entries=mock.ANY,
+        cache_max_bytes=mock.ANY,
+    )
+
+
+def test_on_start_configures_web_client_cache_limits(
+    spotify_mock, web_mock, config
+):
+    config["spotify"]["web_cache_max_entries"] = 100
+    config["spotify"]["web_cache_max_megabytes"] = 2
+
+    backend = get_backend(config)
+    backend.on_start()
+
+    web_mock.SpotifyOAuthClient.assert_called_once_with(
+        client_id=mock.ANY,
+        client_secret=mock.ANY,
+        proxy_config=mock.ANY,
+        base_url=mock.ANY,
+        refresh_url=mock.ANY,
+        max_connections=mock.ANY,
+        rate_limit=mock.ANY,
+        rate_limit_burst=mock.ANY,
+        cache_path=mock.ANY,
+        cache_max_entries=100,
+        cache_max_bytes=2 * 1024 * 1024,
+    )
+
+
+def test_on_start_configures_web_client_rate_limit(
+    spotify_mock, web_mock, config
+):
+    config["spotify"]["web_api_rate_limit"] = 5
+    config["spotify"]["web_api_rate_limit_burst"] = 10
+
+    backend = get_backend(config)
+    backend.on_start()
+
+    web_mock.SpotifyOAuthClient.assert_called_once_with(
+        client_id=mock.ANY,
+        client_secret=mock.ANY,
+        proxy_config=mock.ANY,
+        base_url=mock.ANY,
+        refresh_url=mock.ANY,
+        max_connections=mock.ANY,
+        rate_limit=5,
+        rate_limit_burst=10,
+        cache_path=mock.ANY,
+        cache_max_entries=mock.ANY,
+        cache_max_bytes=mock.ANY,
+    )
+
+
+def test_on_start_configures_web_client_urls(spotify_mock, web_mock, config):
+    config["spotify"]["web_api_base_url"] = "http://localhost:8080/v1"
+    config["spotify"]["web_api_token_url"] = "http://localhost:8080/api/token"
+
+    backend = get_backend(config)
+    backend.on_start()
+
+    web_mock.SpotifyOAuthClient.assert_called_once_with(
+        client_id=mock.ANY,
+        client_secret=mock.ANY,
+        proxy_config=mock.ANY,
+        base_url="http://localhost:8080/v1",
+        refresh_url="http://localhost:8080/api/token",
+        max_connections=mock.ANY,
+        rate_limit=mock.ANY,
+        rate_limit_burst=mock.ANY,
+        cache_path=mock.ANY,
+        cache_max_entries=mock.ANY,
+        cache_max_bytes=mock.ANY,
     )
 
 
@@ -186,6 +343,9 @@ def test_on_start_logs_in(spotify_mock, web_mock, config):
 def test_on_start_refreshes_playlists(spotify_mock, web_mock, config, caplog):
     backend = get_backend(config)
     backend.on_start()
+    refresh_thread = backend.playlists._refresh_thread
+    if refresh_thread is not None:
+        refresh_thread.join()
 
     client_mock = web_mock.SpotifyOAuthClient.return_value
     client_mock.get_user_playlists.assert_called_once()
@@ -220,6 +380,69 @@ def test_on_stop_logs_out_and_waits_for_logout_to_complete(
     backend._event_loop.stop.assert_called_once_with()
 
 
+def test_on_stop_stops_audio_feeder(spotify_mock, config):
+    backend = get_backend(config)
+    backend._logged_out = mock.Mock()
+
+    with mock.patch.object(backend.playback, "close") as close_mock:
+        backend.on_stop()
+
+    close_mock.assert_called_once_with()
+
+
+def test_on_stop_saves_web_client_cache(spotify_mock, config):
+    backend = get_backend(config)
+    backend._logged_out = mock.Mock()
+
+    backend.on_stop()
+
+    backend._web_client.save_cache.assert_called_once_with()
+
+
+def test_on_stop_saves_image_cache(spotify_mock, config):
+    backend = get_backend(config)
+    backend._logged_out = mock.Mock()
+
+    with mock.patch.object(images, "save_cache") as save_mock:
+        backend.on_stop()
+
+    save_mock.assert_called_once_with()
+
+
+def test_on_stop_closes_async_web_client(spotify_mock, config):
+    backend = get_backend(config)
+    backend._logged_out = mock.Mock()
+    backend._web_client_async = mock.Mock()
+
+    backend.on_stop()
+
+    backend._web_client_async.close.assert_called_once_with()
+
+
+def test_on_stop_stops_playlist_refresh_first(spotify_mock, config):
+    backend = get_backend(config)
+    backend._logged_out = mock.Mock()
+    manager = mock.Mock()
+    backend.playlists = manager.playlists
+    backend._web_client = manager.web_client
+
+    backend.on_stop()
+
+    assert manager.mock_calls[:2] == [
+        mock.call.playlists.stop_refresh(),
+        mock.call.web_client.save_cache(),
+    ]
+
+
+def test_on_stop_closes_web_client(spotify_mock, config):
+    backend = get_backend(config)
+    backend._logged_out = mock.Mock()
+
+    backend.on_stop()
+
+    backend._web_client.close.assert_called_once_with()
+
+
 def test_on_connection_state_changed_when_logged_out(spotify_mock, caplog):
     session_mock = spotify_mock.Session.return_value
     session_mock.connection.state = spotify_mock.ConnectionState.LOGGED_OUT
@@ -0,0 +1,140 @@
+from mopidy_spotify import cache
+
+
+def test_persistent_store_load_empty(tmp_path):
+    store = cache.PersistentStore(tmp_path / "cache.db")
+
+    assert store.load() == {}
+
+
+def test_persistent_store_save_and_load(tmp_path):
+    store = cache.PersistentStore(tmp_path / "cache.db")
+
+    assert store.save({"foo": {"bar": [1, 2]}, "baz": None})
+
+    assert store.load() == {"foo": {"bar": [1, 2]}, "baz": None}
+
+
+def test_persistent_store_custom_encoding(tmp_path):
+    store = cache.PersistentStore(
+        tmp_path / "cache.db",
+        default=lambda obj: {"set": sorted(obj)},
+        object_hook=lambda d: set(d["set"]) if "set" in d else d,
+    )
+
+    assert store.save({"foo": {"bar": {2, 1}}})
+
+    assert store.load() == {"foo": {"bar": {1, 2}}}
+
+
+def test_persistent_store_save_replaces_contents(tmp_path):
+    store = cache.PersistentStore(tmp_path / "cache.db")
+    store.save({"foo": 1})
+
+    store.save({"bar": 2})
+
+    assert store.load() == {"bar": 2}
+
+
+def test_persistent_store_load_failure(tmp_path, caplog):
+    path = tmp_path / "cache.db"
+    path.write_bytes(b"not a database")
+    store = cache.PersistentStore(path)
+
+    assert store.load() == {}
+    assert f"Failed to load cache from {path}" in caplog.text
+
+
+def test_persistent_store_save_failure(tmp_path, caplog):
+    path = tmp_path / "missing" / "cache.db"
+    store = cache.PersistentStore(path)
+
+    assert not store.save({"foo": 1})
+    assert f"Failed to save cache to {path}" in caplog.text
+
+
+def test_lru_cache_get_and_set():
+    lru = cache.LRUCache()
+
+    lru["foo"] = 1
+
+    assert lru["foo"] == 1
+    assert "foo" in lru
+    assert len(lru) == 1
+    assert lru == {"foo": 1}
+
+
+def test_lru_cache_evicts_least_recently_used():
+    lru = cache.LRUCache(max_entries=10)
+    for i in range(10):
+        lru[i] = i
+    lru[0]
+
+    lru[10] = 10
+
+    assert 0 in lru
+    assert 1 not in lru
+    assert 10 in lru
+    assert len(lru) == 9
+
+
+def test_lru_cache_evicts_by_size():
+    lru = cache.LRUCache(max_bytes=100, sizeof=len)
+    lru["foo"] = "x" * 60
+
+    lru["bar"] = "x" * 50
+
+    assert "foo" not in lru
+    assert "bar" in lru
+    assert lru.stats["bytes"] == 50
+
+
+def test_lru_cache_evicts_expired_first():
+    lru = cache.LRUCache(max_entries=10, is_expired=lambda v: v < 0)
+    for i in range(10):
+        lru[i] = -1 if i in (4, 5) else i
+
+    lru[10] = -1
+
+    assert 4 not in lru
+    assert 5 not in lru
+    assert 0 in lru
+    assert 10 in lru
+
+
+def test_lru_cache_replace_updates_size():
+    lru = cache.LRUCache(sizeof=len)
+    lru["foo"] = "xxx"
+
+    lru["foo"] = "x"
+
+    assert lru.stats["bytes"] == 1
+
+
+def test_lru_cache_delete_and_clear():
+    lru = cache.LRUCache(sizeof=len)
+    lru["foo"] = "xxx"
+    lru["bar"] = "xx"
+
+    del lru["foo"]
+    assert lru.stats["bytes"] == 2
+
+    lru.clear()
+    assert len(lru) == 0
+    assert lru.stats["bytes"] == 0
+
+
+def test_lru_cache_stats():
+    lru = cache.LRUCache(max_entries=1)
+    lru["foo"] = 1
+    lru.get("foo")
+    lru.get("bar")
+    lru["bar"] = 2
+
+    assert lru.stats == {
+        "entries": 1,
+        "bytes": 0,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 1,
+    }
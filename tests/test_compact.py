@@ -0,0 +1,136 @@
+import json
+
+import pytest
+
+from mopidy_spotify import compact, translator
+
+
+@pytest.fixture
+def web_track_mock(web_track_mock):
+    web_track_mock["album"]["images"] = [
+        {"height": 640, "url": "img://def", "width": 640}
+    ]
+    return web_track_mock
+
+
+@pytest.fixture
+def items(web_track_mock):
+    other_track = dict(web_track_mock, uri="spotify:track:xyz", name="XYZ")
+    return [{"track": web_track_mock}, {"track": other_track}]
+
+
+def test_track_list_items_equal_web_items(items):
+    track_list = compact.TrackList.from_items(items)
+
+    assert len(track_list) == 2
+    assert track_list == items
+    assert track_list[1] == items[1]
+    assert track_list[:1] == items[:1]
+
+
+def test_track_fields_not_used_are_dropped(web_track_mock):
+    web_track_mock["available_markets"] = ["SE", "NO"]
+    web_track_mock["album"]["available_markets"] = ["SE", "NO"]
+
+    track = compact.Track.from_web(web_track_mock)
+
+    assert "available_markets" not in track
+    assert "available_markets" not in track["album"]
+    assert track["album"]["images"] == web_track_mock["album"]["images"]
+
+
+def test_track_linked_from(web_track_mock):
+    web_track_mock["linked_from"] = {"uri": "spotify:track:old"}
+
+    track = compact.Track.from_web(web_track_mock)
+
+    assert track.get("linked_from", {}).get("uri") == "spotify:track:old"
+
+
+def test_albums_and_artists_are_shared(items):
+    track_list1 = compact.TrackList.from_items(items)
+    track_list2 = compact.TrackList.from_items(items)
+
+    track1 = track_list1[0]["track"]
+    track2 = track_list1[1]["track"]
+    assert track1.album is track2.album
+    assert track1.artists[0] is track2.artists[0]
+    assert track1.artists[0] is track1.album.artists[0]
+    assert track_list2[0]["track"] is track1
+
+
+def test_changed_album_is_not_shared(web_track_mock):
+    track1 = compact.Track.from_web(web_track_mock)
+    web_track_mock["album"]["name"] = "DEF 789"
+    track2 = compact.Track.from_web(web_track_mock)
+
+    assert track1.album["name"] == "DEF 456"
+    assert track2.album["name"] == "DEF 789"
+
+
+def test_other_items_are_kept_as_is():
+    items = [{"track": None}, 1, {"track": "foo"}, {"added_at": "bar"}]
+
+    track_list = compact.TrackList.from_items(items)
+
+    assert track_list == items
+
+
+def test_item_fields_are_dropped(web_track_mock):
+    items = [{"track": web_track_mock, "added_at": "2020-01-01T00:00:00Z"}]
+
+    track_list = compact.TrackList.from_items(items)
+
+    assert track_list == [{"track": web_track_mock}]
+
+
+def test_join():
+    track_list = compact.TrackList.join(
+        [[1, 2], compact.TrackList.from_items([3])]
+    )
+
+    assert track_list == [1, 2, 3]
+
+
+def test_json_round_trip(items):
+    items.append({"track": None})
+    items.append("raw")
+    track_list = compact.TrackList.from_items(items)
+
+    data = json.dumps({"items": track_list}, default=compact.to_json)
+    result = json.loads(data, object_hook=compact.from_json)["items"]
+
+    assert isinstance(result, compact.TrackList)
+    assert result == items
+    assert result[0]["track"].album is result[1]["track"].album
+
+
+def test_json_albums_are_written_once(items):
+    track_list = compact.TrackList.from_items(items)
+
+    data = json.loads(json.dumps(track_list, default=compact.to_json))
+
+    table = data["__compact_tracks__"]
+    assert len(table["albums"]) == 1
+    assert len(table["artists"]) == 1
+    assert len(table["tracks"]) == 2
+
+
+def test_to_json_rejects_other_objects():
+    with pytest.raises(TypeError):
+        json.dumps(object(), default=compact.to_json)
+
+
+def test_translates_like_web_items(items, web_playlist_mock):
+    web_playlist_mock["tracks"]["items"] = items
+    compact_playlist = dict(
+        web_playlist_mock,
+        tracks={"items": compact.TrackList.from_items(items)},
+    )
+
+    assert translator.to_playlist(compact_playlist) == translator.to_playlist(
+        web_playlist_mock
+    )
+    assert translator.to_playlist(
+        compact_playlist, as_items=True
+    ) == translator.to_playlist(web_playlist_mock, as_items=True)
@@ -27,6 +27,15 @@ def test_get_config_schema():
     assert "cache_dir" in schema
     assert "settings_dir" in schema
     assert "allow_cache" in schema
+    assert "web_cache_max_entries" in schema
+    assert "web_cache_max_megabytes" in schema
+    assert "image_cache_max_entries" in schema
+    assert "image_cache_ttl" in schema
+    assert "web_api_base_url" in schema
+    assert "web_api_token_url" in schema
+    assert "web_api_max_connections" in schema
+    assert "web_api_rate_limit" in schema
+    assert "web_api_rate_limit_burst" in schema
     assert "allow_network" in schema
     assert "allow_playlists" in schema
     assert "search_album_count" in schema
@@ -1,15 +1,41 @@
+import threading
+import time
+from unittest import mock
+
 import pytest
 from mopidy import models
 
-from mopidy_spotify import images
+from mopidy_spotify import cache, images, web
 
 
 @pytest.fixture
 def img_provider(provider):
-    images._cache = {}
+    images._cache = images.ImageCache()
     return provider
 
 
+@pytest.fixture
+def async_img_provider(img_provider, backend_mock, web_client_mock):
+    async_web_client = web.AsyncSpotifyOAuthClient(
+        web_client_mock, max_concurrency=3
+    )
+    backend_mock._web_client_async = async_web_client
+    yield img_provider
+    async_web_client.close()
+
+
+@pytest.fixture
+def album_response():
+    return {
+        "albums": [
+            {
+                "id": "1utFPuvgBHXzLJdqhCDOkg",
+                "images": [{"height": 640, "url": "img://1/a", "width": 640}],
+            }
+        ]
+    }
+
+
 def test_get_artist_images(web_client_mock, img_provider):
     uris = [
         "spotify:artist:4FCGgZrVQtcbDFEap3OAb2",
@@ -169,16 +195,16 @@ def test_get_relinked_track_images(web_client_mock, img_provider):
 def test_get_playlist_image(web_client_mock, img_provider):
     uris = ["spotify:playlist:41shEpOKyyadtG6lDclooa"]
 
-    web_client_mock.get.return_value = {
-        "id": "41shEpOKyyadtG6lDclooa",
+    web_client_mock.get_one.return_value = {
         "images": [{"height": 640, "url": "img://1/a", "width": 640}],
     }
 
     result = img_provider.get_images(uris)
 
-    web_client_mock.get.assert_called_once_with(
-        "playlists/41shEpOKyyadtG6lDclooa"
+    web_client_mock.get_one.assert_called_once_with(
+        "playlists/41shEpOKyyadtG6lDclooa", params={"fields": "images"}
     )
+    web_client_mock.get.assert_not_called()
 
     assert len(result) == 1
     assert sorted(result.keys()) == sorted(uris)
@@ -215,6 +241,93 @@ def test_results_are_cached(web_client_mock, img_provider):
     assert result1 == result2
 
 
+def test_expired_results_are_fetched_again(
+    web_client_mock, img_provider, album_response
+):
+    uris = ["spotify:album:1utFPuvgBHXzLJdqhCDOkg"]
+    images._cache.ttl = 0
+    web_client_mock.get.return_value = album_response
+
+    img_provider.get_images(uris)
+    img_provider.get_images(uris)
+
+    assert web_client_mock.get.call_count == 2
+
+
+def test_cache_evicts_least_recently_used_entries():
+    image_cache = images.ImageCache(max_entries=3)
+    for key in "abc":
+        image_cache.set(("album", key), [])
+    image_cache.get(("album", "a"))
+    image_cache.set(("album", "d"), [])
+
+    assert image_cache.get(("album", "a")) == ()
+    assert image_cache.get(("album", "b")) is None
+    assert image_cache.get(("album", "d")) == ()
+    assert image_cache.stats == {
+        "entries": 2,
+        "hits": 3,
+        "misses": 1,
+        "expired": 0,
+        "evictions": 2,
+    }
+
+
+def test_cache_is_persisted(tmp_path, web_client_mock, album_response):
+    path = tmp_path / "image_cache.db"
+    uris = ["spotify:album:1utFPuvgBHXzLJdqhCDOkg"]
+    web_client_mock.get.return_value = album_response
+
+    images.configure_cache(path=path)
+    result1 = images.get_images(web_client_mock, uris)
+    images.save_cache()
+    images.configure_cache(path=path)
+    result2 = images.get_images(web_client_mock, uris)
+
+    assert web_client_mock.get.call_count == 1
+    assert result1 == result2
+    assert images.cache_stats()["hits"] == 1
+
+
+def test_invalid_persisted_entries_are_ignored(tmp_path, caplog):
+    path = tmp_path / "image_cache.db"
+    cache.PersistentStore(path).save(
+        {
+            "album:a": {"images": [], "expires": time.time() + 60},
+            "album:b": {"images": [{"url": "img://b"}], "expires": 0},
+            "album:c": {"images": [], "expires": 0},
+        }
+    )
+
+    image_cache = images.ImageCache(path=path)
+
+    assert len(image_cache) == 1
+    assert image_cache.get(("album", "a")) == ()
+    assert "Ignoring invalid image cache entry 'album:b'" in caplog.text
+
+
+def test_playlist_without_images(web_client_mock, img_provider):
+    uris = ["spotify:playlist:41shEpOKyyadtG6lDclooa"]
+    web_client_mock.get_one.return_value = {"images": None}
+
+    result = img_provider.get_images(uris)
+
+    assert result == {uris[0]: ()}
+
+
+def test_failed_playlist_image_lookup_is_not_cached(
+    web_client_mock, img_provider
+):
+    uris = ["spotify:playlist:41shEpOKyyadtG6lDclooa"]
+    web_client_mock.get_one.return_value = {}
+
+    result1 = img_provider.get_images(uris)
+    result2 = img_provider.get_images(uris)
+
+    assert result1 == result2 == {}
+    assert web_client_mock.get_one.call_count == 2
+
+
 def test_max_50_ids_per_request(web_client_mock, img_provider):
     uris = [f"spotify:track:{i}" for i in range(51)]
 
@@ -223,12 +336,14 @@ def test_max_50_ids_per_request(web_client_mock, img_provider):
     img_provider.get_images(uris)
 
     assert web_client_mock.get.call_count == 2
-
-    request_ids_1 = web_client_mock.get.call_args_list[0][1]["params"]["ids"]
-    assert request_ids_1 == ",".join(str(i) for i in range(50))
-
-    request_ids_2 = web_client_mock.get.call_args_list[1][1]["params"]["ids"]
-    assert request_ids_2 == "50"
+    web_client_mock.get.assert_has_calls(
+        [
+            mock.call(
+                "tracks", params={"ids": ",".join(str(i) for i in range(50))}
+            ),
+            mock.call("tracks", params={"ids": "50"}),
+        ]
+    )
 
 
 def test_invalid_uri_fails(img_provider):
@@ -250,3 +365,83 @@ def test_service_returns_empty_result(web_client_mock, img_provider):
     result = img_provider.get_images(["spotify:track:41shEpOKyyadtG6lDclooa"])
 
     assert result == {}
+
+
+def test_requests_are_made_concurrently(web_client_mock, async_img_provider):
+    uris = [f"spotify:playlist:{i}" for i in range(3)]
+    barrier = threading.Barrier(len(uris), timeout=5)
+
+    def get_one(path, params):
+        barrier.wait()
+        return {"images": [{"height": 1, "url": f"img://{path}", "width": 1}]}
+
+    web_client_mock.get_one.side_effect = get_one
+
+    result = async_img_provider.get_images(uris)
+
+    assert list(result) == uris
+    assert result[uris[1]][0].uri == "img://playlists/1"
+
+
+def test_results_are_merged_in_request_order(
+    web_client_mock, async_img_provider
+):
+    uris = ["spotify:playlist:slow", "spotify:playlist:fast"]
+    fast_done = threading.Event()
+
+    def get_one(path, params):
+        if path.endswith("slow"):
+            assert fast_done.wait(timeout=5)
+        else:
+            fast_done.set()
+        return {"images": []}
+
+    web_client_mock.get_one.side_effect = get_one
+
+    result = async_img_provider.get_images(uris)
+
+    assert list(result) == uris
+
+
+def test_cache_add_keeps_cached_images():
+    image_cache = images.ImageCache()
+    image_cache.set(("album", "a"), ["foo"])
+
+    result = image_cache.add(("album", "a"), ["bar"])
+
+    assert result == ("foo",)
+    assert image_cache.get(("album", "a")) == ("foo",)
+    assert image_cache.stats["hits"] == 1
+
+
+def test_cache_add_does_not_evict():
+    image_cache = images.ImageCache(max_entries=1)
+    image_cache.set(("album", "a"), [])
+
+    assert image_cache.full
+    assert image_cache.add(("album", "b"), []) is None
+    assert image_cache.get(("album", "a")) == ()
+    assert image_cache.stats["evictions"] == 0
+
+
+def test_cache_playlist_images_stops_when_cache_is_full(img_provider):
+    images._cache = images.ImageCache(max_entries=3)
+    items = [
+        {
+            "track": {
+                "uri": f"spotify:track:{i}",
+                "album": {
+                    "uri": f"spotify:album:{i}",
+                    "images": [{"height": 1, "url": f"img://{i}", "width": 1}],
+                },
+            }
+        }
+        for i in range(3)
+    ]
+
+    images.cache_playlist_images({"tracks": {"items": items}})
+
+    assert len(images._cache) == 3
+    assert images._cache.get(("track", "0"))[0].uri == "img://0"
+    assert images._cache.get(("track", "1")) is None
+    assert images._cache.stats["evictions"] == 0
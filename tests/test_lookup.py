@@ -1,6 +1,7 @@
 from unittest import mock
 
 import spotify
+from mopidy_spotify import web
 
 
 def test_lookup_of_invalid_uri(provider, caplog):
@@ -192,3 +193,131 @@ def test_lookup_of_playlist_uri_when_not_logged_in(
         "Failed to lookup 'spotify:playlist:alice:foo': "
         "Playlist Web API lookup failed" in caplog.text
     )
+
+
+def test_lookup_many_of_tracks(web_client_mock, web_track_mock, provider):
+    web_track_mock["id"] = "abc"
+    web_client_mock.get_one.return_value = {"tracks": [web_track_mock, None]}
+
+    results = provider.lookup_many(["spotify:track:abc", "spotify:track:xyz"])
+
+    web_client_mock.get_one.assert_called_once_with(
+        "tracks", params={"ids": "abc,xyz", "market": "from_token"}
+    )
+    assert list(results.keys()) == ["spotify:track:abc", "spotify:track:xyz"]
+    assert results["spotify:track:xyz"] == []
+    track = results["spotify:track:abc"][0]
+    assert track.uri == "spotify:track:abc"
+    assert track.name == "ABC 123"
+    assert track.album.name == "DEF 456"
+    assert track.bitrate == 160
+
+
+def test_lookup_many_of_relinked_track(
+    web_client_mock, web_track_mock, provider
+):
+    web_track_mock["id"] = "def"
+    web_track_mock["linked_from"] = {"id": "abc", "uri": "spotify:track:abc"}
+    web_client_mock.get_one.return_value = {"tracks": [web_track_mock]}
+
+    results = provider.lookup_many(["spotify:track:abc"])
+
+    assert results["spotify:track:abc"][0].uri == "spotify:track:abc"
+
+
+def test_lookup_many_batches_tracks(web_client_mock, provider):
+    web_client_mock.get_one.return_value = {}
+    uris = [f"spotify:track:{i}" for i in range(120)]
+
+    results = provider.lookup_many(uris)
+
+    assert web_client_mock.get_one.call_count == 3
+    assert len(results) == 120
+
+
+def test_lookup_many_fetches_batches_concurrently(
+    web_client_mock, web_track_mock, provider, backend_mock
+):
+    web_track_mock["id"] = "0"
+    async_web_client = mock.Mock(spec=web.AsyncSpotifyOAuthClient)
+    async_web_client.get_many.return_value = [
+        {"tracks": [web_track_mock]},
+        {"albums": []},
+    ]
+    backend_mock._web_client_async = async_web_client
+
+    results = provider.lookup_many(["spotify:track:0", "spotify:album:1"])
+
+    async_web_client.get_many.assert_called_once_with(
+        [
+            ("tracks", {"ids": "0", "market": "from_token"}),
+            ("albums", {"ids": "1", "market": "from_token"}),
+        ]
+    )
+    web_client_mock.get_one.assert_not_called()
+    assert results["spotify:track:0"][0].name == "ABC 123"
+    assert results["spotify:album:1"] == []
+
+
+def test_lookup_many_of_albums(
+    web_client_mock, web_album_mock, web_track_mock, provider
+):
+    del web_track_mock["album"]
+    web_album_mock["id"] = "def"
+    web_album_mock["tracks"] = {
+        "items": [web_track_mock],
+        "next": "albums/def/tracks?offset=1",
+    }
+    web_client_mock.get_one.return_value = {"albums": [web_album_mock]}
+    web_client_mock.get_all.return_value = [{"items": [web_track_mock]}]
+
+    results = provider.lookup_many(["spotify:album:def"])
+
+    web_client_mock.get_one.assert_called_once_with(
+        "albums", params={"ids": "def", "market": "from_token"}
+    )
+    web_client_mock.get_all.assert_called_once_with(
+        "albums/def/tracks?offset=1", params={"market": "from_token"}
+    )
+    tracks = results["spotify:album:def"]
+    assert len(tracks) == 2
+    assert tracks[0].album.uri == "spotify:album:def"
+
+
+def test_lookup_many_batches_albums(web_client_mock, provider):
+    web_client_mock.get_one.return_value = {}
+    uris = [f"spotify:album:{i}" for i in range(30)]
+
+    provider.lookup_many(uris)
+
+    assert web_client_mock.get_one.call_count == 2
+
+
+def test_lookup_many_falls_back_to_lookup(
+    session_mock,
+    web_client_mock,
+    sp_artist_browser_mock,
+    sp_album_browser_mock,
+    provider,
+):
+    sp_artist_mock = sp_artist_browser_mock.artist
+    session_mock.get_link.return_value = sp_artist_mock.link
+
+    results = provider.lookup_many(["spotify:artist:abba", "invalid"])
+
+    web_client_mock.get_one.assert_not_called()
+    session_mock.get_link.assert_called_once_with("spotify:artist:abba")
+    assert results["invalid"] == []
+    assert len(results["spotify:artist:abba"]) == 4
+
+
+def test_lookup_many_when_not_logged_in(
+    session_mock, web_client_mock, sp_track_mock, provider
+):
+    web_client_mock.logged_in = False
+    session_mock.get_link.return_value = sp_track_mock.link
+
+    results = provider.lookup_many(["spotify:track:abc"])
+
+    web_client_mock.get_one.assert_not_called()
+    assert results["spotify:track:abc"][0].uri == "spotify:track:abc"
@@ -23,6 +23,13 @@ def audio_lib_mock():
     patcher.stop()
 
 
+@pytest.fixture
+def gst_lib_mock():
+    with mock.patch.object(playback, "_buffer_mapping_supported", True):
+        with mock.patch.object(playback, "Gst") as gst_mock:
+            yield gst_mock
+
+
 @pytest.fixture
 def session_mock():
     sp_session_mock = mock.Mock(spec=spotify.Session)
@@ -60,10 +67,11 @@ def test_connect_events_adds_music_delivery_handler_to_session(
         mock.call(
             spotify.SessionEvent.MUSIC_DELIVERY,
             playback.music_delivery_callback,
-            audio_mock,
+            playback_provider._audio_feeder,
             playback_provider._seeking_event,
             playback_provider._push_audio_data_event,
             playback_provider._buffer_timestamp,
+            playback_provider._stats,
         )
         in session_mock.on.call_args_list
     )
@@ -81,12 +89,30 @@ def test_connect_events_adds_end_of_track_handler_to_session(
             spotify.SessionEvent.END_OF_TRACK,
             playback.end_of_track_callback,
             playback_provider._end_of_track_event,
-            audio_mock,
+            playback_provider._audio_feeder,
         )
         in session_mock.on.call_args_list
     )
 
 
+def test_connect_events_starts_audio_feeder(provider):
+    provider._connect_events()
+
+    try:
+        assert provider._audio_feeder._thread.is_alive()
+    finally:
+        provider._audio_feeder.stop()
+
+
+def test_close_stops_audio_feeder(provider):
+    provider._connect_events()
+    thread = provider._audio_feeder._thread
+
+    provider.close()
+
+    assert not thread.is_alive()
+
+
 def test_change_track_aborts_if_no_track_uri(provider):
     track = models.Track()
 
@@ -106,6 +132,47 @@ def test_change_track_loads_and_plays_spotify_track(session_mock, provider):
     session_mock.player.play.assert_called_once_with()
 
 
+def test_prefetch_loads_track_and_prefetches_audio(session_mock, provider):
+    uri = "spotify:track:test"
+
+    assert provider.prefetch(uri) is True
+
+    session_mock.get_track.assert_called_once_with(uri)
+    sp_track_mock = session_mock.get_track.return_value
+    sp_track_mock.load.assert_called_once_with(10)
+    session_mock.player.prefetch.assert_called_once_with(sp_track_mock)
+
+
+def test_prefetch_fails_on_spotify_error(session_mock, provider):
+    session_mock.get_track.side_effect = spotify.Error
+
+    assert provider.prefetch("spotify:track:test") is False
+    assert session_mock.player.prefetch.call_count == 0
+
+
+def test_change_track_uses_prefetched_track(session_mock, provider):
+    uri = "spotify:track:test"
+    provider.prefetch(uri)
+    sp_track_mock = session_mock.get_track.return_value
+    session_mock.reset_mock()
+
+    assert provider.change_track(models.Track(uri=uri)) is True
+
+    assert session_mock.get_track.call_count == 0
+    assert sp_track_mock.load.call_count == 0
+    session_mock.player.load.assert_called_once_with(sp_track_mock)
+
+
+def test_change_track_ignores_prefetch_of_other_track(session_mock, provider):
+    provider.prefetch("spotify:track:other")
+    session_mock.reset_mock()
+
+    assert provider.change_track(models.Track(uri="spotify:track:test"))
+
+    session_mock.get_track.assert_called_once_with("spotify:track:test")
+    assert provider._prefetched is None
+
+
 def test_change_track_aborts_on_spotify_error(session_mock, provider):
     track = models.Track(uri="spotfy:track:test")
     session_mock.get_track.side_effect = spotify.Error
@@ -113,6 +180,79 @@ def test_change_track_aborts_on_spotify_error(session_mock, provider):
     assert provider.change_track(track) is False
 
 
+def test_change_track_sets_up_source_setup_callback(audio_mock, provider):
+    assert provider.change_track(models.Track(uri="spotify:track:test"))
+
+    audio_mock.set_source_setup_callback.assert_called_once_with(
+        provider.on_source_setup
+    )
+
+
+def test_change_track_without_source_setup_callback_support(
+    audio_mock, provider
+):
+    # Mopidy < 3.4
+    del audio_mock.set_source_setup_callback
+
+    assert provider.change_track(models.Track(uri="spotify:track:test"))
+
+    audio_mock.set_appsrc.assert_called_once()
+
+
+@pytest.fixture
+def appsrc_mock():
+    source = mock.Mock()
+    source.get_factory.return_value.get_name.return_value = "appsrc"
+    return source
+
+
+def test_on_source_setup_keeps_queue_size_without_enough_deliveries(
+    provider, appsrc_mock
+):
+    provider._stats.rejected_deliveries = 50
+
+    provider.on_source_setup(appsrc_mock)
+
+    appsrc_mock.set_property.assert_called_once_with("max-bytes", 1 << 20)
+
+
+def test_on_source_setup_grows_queue_when_deliveries_are_rejected(
+    provider, appsrc_mock
+):
+    provider._stats.accepted_deliveries = 100
+    provider._stats.rejected_deliveries = 100
+
+    provider.on_source_setup(appsrc_mock)
+
+    appsrc_mock.set_property.assert_called_once_with("max-bytes", 1 << 21)
+    assert provider.playback_stats["appsrc_max_bytes"] == 1 << 21
+
+
+def test_on_source_setup_shrinks_queue_when_deliveries_are_accepted(
+    provider, appsrc_mock
+):
+    provider._appsrc_max_bytes = 1 << 23
+    provider._stats.accepted_deliveries = 1000
+
+    provider.on_source_setup(appsrc_mock)
+    provider._stats.accepted_deliveries += 50
+    provider.on_source_setup(appsrc_mock)
+
+    assert appsrc_mock.set_property.call_args_list == [
+        mock.call("max-bytes", 1 << 22),
+        mock.call("max-bytes", 1 << 22),
+    ]
+
+
+def test_on_source_setup_ignores_other_sources(provider):
+    source = mock.Mock()
+    source.get_factory.return_value.get_name.return_value = "souphttpsrc"
+
+    provider.on_source_setup(source)
+
+    assert source.set_property.call_count == 0
+
+
 def test_change_track_sets_up_appsrc(audio_mock, provider):
     track = models.Track(uri="spotfy:track:test")
 
@@ -157,6 +297,33 @@ def test_on_seek_data_updates_timestamp_and_seeks_in_spotify(
     session_mock.player.seek.assert_called_once_with(1780)
 
 
+def test_on_seek_data_drops_queued_audio(provider):
+    provider._audio_feeder.emit_data(mock.sentinel.gst_buffer)
+
+    provider.on_seek_data(1780)
+
+    assert len(provider._audio_feeder) == 0
+
+
+def test_change_track_drops_queued_audio_of_interrupted_track(provider):
+    provider._audio_feeder.emit_data(mock.sentinel.gst_buffer)
+
+    provider.change_track(models.Track(uri="spotify:track:test"))
+
+    assert len(provider._audio_feeder) == 0
+
+
+def test_change_track_keeps_queued_audio_after_end_of_track(provider):
+    provider._events_connected = True  # Keep the feeder thread stopped
+    provider._audio_feeder.emit_data(mock.sentinel.gst_buffer)
+    provider._audio_feeder.emit_data(None)
+    provider._end_of_track_event.set()
+
+    provider.change_track(models.Track(uri="spotify:track:test"))
+
+    assert len(provider._audio_feeder) == 2
+
+
 def test_on_seek_data_ignores_first_seek_to_zero_on_every_play(
     session_mock, provider
 ):
@@ -179,6 +346,62 @@ def test_need_data_callback():
     assert event.is_set()
 
 
+def test_need_data_callback_retries_rejected_buffers():
+    event = threading.Event()
+    audio_feeder = mock.Mock(spec=playback.AudioFeeder)
+
+    playback.need_data_callback(event, 100, audio_feeder=audio_feeder)
+
+    audio_feeder.retry.assert_called_once_with()
+
+
+def test_need_data_callback_counts_underruns_while_playing():
+    event = threading.Event()
+    stats = playback.PlaybackStats()
+    is_starved = mock.Mock(return_value=True)
+
+    playback.need_data_callback(event, 100, stats=stats, is_starved=is_starved)
+    stats.delivery_accepted()
+    playback.need_data_callback(event, 100, stats=stats, is_starved=is_starved)
+
+    assert stats.underruns == 1
+
+
+def test_need_data_callback_ignores_refills():
+    event = threading.Event()
+    stats = playback.PlaybackStats()
+    stats.delivery_accepted()
+
+    playback.need_data_callback(event, 100, stats=stats)
+    playback.need_data_callback(
+        event, 100, stats=stats, is_starved=mock.Mock(return_value=False)
+    )
+
+    assert stats.need_data_signals == 2
+    assert stats.underruns == 0
+
+
+def test_is_starved_when_all_queues_are_empty(provider, appsrc_mock):
+    appsrc_mock.get_property.return_value = 0
+    assert not provider._is_starved()
+
+    provider.on_source_setup(appsrc_mock)
+
+    assert provider._is_starved()
+    appsrc_mock.get_property.assert_called_with("current-level-bytes")
+
+
+def test_is_not_starved_with_audio_queued(provider, appsrc_mock):
+    provider.on_source_setup(appsrc_mock)
+    appsrc_mock.get_property.return_value = 4096
+    assert not provider._is_starved()
+
+    appsrc_mock.get_property.return_value = 0
+    provider._audio_feeder.emit_data(mock.sentinel.gst_buffer)
+
+    assert not provider._is_starved()
+
+
 def test_enough_data_callback():
     event = threading.Event()
     event.set()
@@ -189,6 +412,18 @@ def test_enough_data_callback():
     assert not event.is_set()
 
 
+def test_need_and_enough_data_callbacks_are_counted():
+    event = threading.Event()
+    stats = playback.PlaybackStats()
+
+    playback.need_data_callback(event, 100, stats=stats)
+    playback.enough_data_callback(event, stats=stats)
+    playback.enough_data_callback(event, stats=stats)
+
+    assert stats.need_data_signals == 1
+    assert stats.enough_data_signals == 2
+
+
 def test_seek_data_callback():
     seeking_event = threading.Event()
     backend_mock = mock.Mock()
@@ -226,6 +461,50 @@ def test_music_delivery_rejects_data_when_seeking(session_mock, audio_mock):
     assert result == num_frames
 
 
+def test_music_delivery_records_seek_to_resume_time(session_mock, audio_mock):
+    seeking_event = threading.Event()
+    seeking_event.set()
+    stats = playback.PlaybackStats()
+    with mock.patch.object(playback.time, "monotonic", side_effect=[1, 1.25]):
+        stats.seek_started()
+
+        playback.music_delivery_callback(
+            session_mock,
+            mock.Mock(),
+            b"",
+            0,
+            audio_mock,
+            seeking_event,
+            threading.Event(),
+            mock.Mock(),
+            stats,
+        )
+
+    snapshot = stats.seek_to_resume.snapshot()
+    assert snapshot["count"] == 1
+    assert snapshot["sum"] == 250
+
+
+def test_music_delivery_counts_rejected_deliveries(session_mock, audio_mock):
+    push_audio_data_event = threading.Event()
+    stats = playback.PlaybackStats()
+
+    result = playback.music_delivery_callback(
+        session_mock,
+        mock.Mock(),
+        b"\x00\x00",
+        1,
+        audio_mock,
+        threading.Event(),
+        push_audio_data_event,
+        mock.Mock(),
+        stats,
+    )
+
+    assert result == 0
+    assert stats.rejected_deliveries == 1
+
+
 def test_music_delivery_when_seeking_accepts_data_after_empty_delivery(
     session_mock, audio_mock
 ):
@@ -337,9 +616,13 @@ def test_music_delivery_rejects_unknown_audio_formats(session_mock, audio_mock):
 
 
 def test_music_delivery_creates_gstreamer_buffer_and_gives_it_to_audio(
-    session_mock, audio_mock, audio_lib_mock
+    session_mock, audio_mock, audio_lib_mock, gst_lib_mock
 ):
 
+    gst_lib_mock.Buffer.new_allocate.return_value.map.return_value = (
+        False,
+        None,
+    )
     audio_lib_mock.calculate_duration.return_value = mock.sentinel.duration
     audio_lib_mock.create_buffer.return_value = mock.sentinel.gst_buffer
 
@@ -375,9 +658,13 @@ def test_music_delivery_creates_gstreamer_buffer_and_gives_it_to_audio(
 
 
 def test_music_delivery_consumes_zero_frames_if_audio_fails(
-    session_mock, audio_mock, audio_lib_mock
+    session_mock, audio_mock, audio_lib_mock, gst_lib_mock
 ):
 
+    gst_lib_mock.Buffer.new_allocate.return_value.map.return_value = (
+        False,
+        None,
+    )
     audio_mock.emit_data.return_value.get.return_value = False
 
     audio_format = mock.Mock(channels=2, sample_rate=44100, sample_type=0)
@@ -404,6 +691,73 @@ def test_music_delivery_consumes_zero_frames_if_audio_fails(
     assert result == 0
 
 
+def test_create_buffer_copies_frames_into_mapped_buffer(
+    audio_lib_mock, gst_lib_mock
+):
+    data = bytearray(4)
+    map_info = mock.Mock(data=memoryview(data))
+    buffer_mock = gst_lib_mock.Buffer.new_allocate.return_value
+    buffer_mock.map.return_value = (True, map_info)
+
+    result = playback.create_buffer(
+        b"\x01\x02\x03\x04",
+        timestamp=mock.sentinel.timestamp,
+        duration=mock.sentinel.duration,
+    )
+
+    assert result is buffer_mock
+    assert data == b"\x01\x02\x03\x04"
+    gst_lib_mock.Buffer.new_allocate.assert_called_once_with(None, 4, None)
+    buffer_mock.unmap.assert_called_once_with(map_info)
+    assert result.pts == mock.sentinel.timestamp
+    assert result.duration == mock.sentinel.duration
+    assert audio_lib_mock.create_buffer.call_count == 0
+
+
+def test_create_buffer_falls_back_if_mapped_memory_is_read_only(
+    audio_lib_mock, gst_lib_mock
+):
+    map_info = mock.Mock(data=b"\x00\x00")
+    buffer_mock = gst_lib_mock.Buffer.new_allocate.return_value
+    buffer_mock.map.return_value = (True, map_info)
+    audio_lib_mock.create_buffer.return_value = mock.sentinel.gst_buffer
+
+    for _ in range(2):
+        result = playback.create_buffer(
+            bytearray(b"\x01\x02"),
+            timestamp=mock.sentinel.timestamp,
+            duration=mock.sentinel.duration,
+        )
+
+        assert result is mock.sentinel.gst_buffer
+
+    buffer_mock.unmap.assert_called_once_with(map_info)
+    assert gst_lib_mock.Buffer.new_allocate.call_count == 1
+    audio_lib_mock.create_buffer.assert_called_with(
+        b"\x01\x02",
+        timestamp=mock.sentinel.timestamp,
+        duration=mock.sentinel.duration,
+    )
+
+
+def test_create_buffer_falls_back_if_mapping_raises(
+    audio_lib_mock, gst_lib_mock
+):
+    buffer_mock = gst_lib_mock.Buffer.new_allocate.return_value
+    buffer_mock.map.side_effect = TypeError("unexpected map() result")
+    audio_lib_mock.create_buffer.return_value = mock.sentinel.gst_buffer
+
+    result = playback.create_buffer(
+        b"\x01\x02",
+        timestamp=mock.sentinel.timestamp,
+        duration=mock.sentinel.duration,
+    )
+
+    assert result is mock.sentinel.gst_buffer
+    assert not playback._buffer_mapping_supported
+    buffer_mock.unmap.assert_not_called()
+
+
 def test_end_of_track_callback(session_mock, audio_mock):
     end_of_track_event = threading.Event()
 
@@ -423,6 +777,28 @@ def test_duplicate_end_of_track_callback_is_ignored(session_mock, audio_mock):
     assert audio_mock.emit_data.call_count == 0
 
 
+def test_playback_stats_time_to_first_audio():
+    stats = playback.PlaybackStats()
+    with mock.patch.object(playback.time, "monotonic", side_effect=[10, 10.1]):
+        stats.track_changed()
+        stats.delivery_accepted()
+        stats.delivery_accepted()
+
+    snapshot = stats.snapshot()
+    assert snapshot["time_to_first_audio"]["count"] == 1
+    assert snapshot["time_to_first_audio"]["buckets"][3] == (100, 1)
+    assert snapshot["seek_to_resume"]["count"] == 0
+    assert snapshot["rejected_deliveries"] == 0
+    assert snapshot["retried_deliveries"] == 0
+    assert snapshot["underruns"] == 0
+
+
+def test_playback_stats_exposed_by_provider(provider):
+    provider.change_track(models.Track(uri="spotify:track:test"))
+
+    assert provider.playback_stats["time_to_first_audio"]["count"] == 0
+
+
 def test_buffer_timestamp_wrapper():
     wrapper = playback.BufferTimestamp(0)
     assert wrapper.get() == 0
@@ -432,3 +808,100 @@ def test_buffer_timestamp_wrapper():
 
     wrapper.increase(3)
     assert wrapper.get() == 20
+
+
+def test_audio_feeder_emit_data_does_not_wait_for_audio(audio_mock):
+    feeder = playback.AudioFeeder(audio_mock)
+
+    assert feeder.emit_data(mock.sentinel.gst_buffer).get(timeout=0) is True
+    assert len(feeder) == 1
+    assert audio_mock.emit_data.call_count == 0
+
+
+def test_audio_feeder_rejects_buffers_when_full(audio_mock):
+    feeder = playback.AudioFeeder(audio_mock, max_buffers=1)
+
+    assert feeder.emit_data(mock.sentinel.gst_buffer1).get() is True
+    assert feeder.emit_data(mock.sentinel.gst_buffer2).get() is False
+    assert feeder.emit_data(None).get() is True
+    assert len(feeder) == 2
+
+
+def test_audio_feeder_pushes_buffers_to_audio_in_order(audio_mock):
+    done = threading.Event()
+    emitted = []
+
+    def emit_data(buffer_):
+        emitted.append(buffer_)
+        if buffer_ is None:
+            done.set()
+        return mock.Mock(get=mock.Mock(return_value=True))
+
+    audio_mock.emit_data.side_effect = emit_data
+    feeder = playback.AudioFeeder(audio_mock)
+    feeder.emit_data(mock.sentinel.gst_buffer1)
+    feeder.emit_data(mock.sentinel.gst_buffer2)
+    feeder.emit_data(None)
+
+    feeder.start()
+    try:
+        assert done.wait(timeout=1)
+    finally:
+        feeder.stop()
+
+    assert emitted == [
+        mock.sentinel.gst_buffer1,
+        mock.sentinel.gst_buffer2,
+        None,
+    ]
+    assert len(feeder) == 0
+
+
+def test_audio_feeder_retries_buffers_rejected_by_audio(audio_mock):
+    ready = threading.Event()
+    rejected = threading.Event()
+    done = threading.Event()
+    pushed = []
+
+    def emit_data(buffer_):
+        if not ready.is_set():
+            rejected.set()
+            return mock.Mock(get=mock.Mock(return_value=False))
+        pushed.append(buffer_)
+        if buffer_ is None:
+            done.set()
+        return mock.Mock(get=mock.Mock(return_value=True))
+
+    audio_mock.emit_data.side_effect = emit_data
+    stats = playback.PlaybackStats()
+    feeder = playback.AudioFeeder(audio_mock, stats=stats)
+    feeder.emit_data(mock.sentinel.gst_buffer1)
+    feeder.emit_data(mock.sentinel.gst_buffer2)
+    feeder.emit_data(None)
+
+    feeder.start()
+    try:
+        assert rejected.wait(timeout=1)
+        assert len(feeder) == 3
+        ready.set()
+        feeder.retry()
+        assert done.wait(timeout=1)
+    finally:
+        feeder.stop()
+
+    assert pushed == [
+        mock.sentinel.gst_buffer1,
+        mock.sentinel.gst_buffer2,
+        None,
+    ]
+    assert len(feeder) == 0
+    assert stats.snapshot()["retried_deliveries"] >= 1
+
+
+def test_audio_feeder_clear_drops_queued_buffers(audio_mock):
+    feeder = playback.AudioFeeder(audio_mock)
+    feeder.emit_data(mock.sentinel.gst_buffer)
+
+    feeder.clear()
+
+    assert len(feeder) == 0
@@ -1,3 +1,4 @@
+import threading
 from unittest import mock
 
 import pytest
@@ -5,7 +6,7 @@ from mopidy import backend as backend_api
 from mopidy.models import Ref
 
 import spotify
-from mopidy_spotify import playlists
+from mopidy_spotify import images, playlists
 
 
 @pytest.fixture
@@ -50,6 +51,13 @@ def provider(backend_mock, web_client_mock):
     return provider
 
 
+def refresh(provider):
+    provider.refresh()
+    thread = provider._refresh_thread
+    if thread is not None:
+        thread.join()
+
+
 def test_is_a_playlists_provider(provider):
     assert isinstance(provider, backend_api.PlaylistsProvider)
 
@@ -144,7 +152,7 @@ def test_get_items_when_playlist_is_unknown(provider, caplog):
 
 
 def test_refresh_loads_all_playlists(provider, web_client_mock):
-    provider.refresh()
+    refresh(provider)
 
     web_client_mock.get_user_playlists.assert_called_once()
     assert web_client_mock.get_playlist.call_count == 2
@@ -155,11 +163,217 @@ def test_refresh_loads_all_playlists(provider, web_client_mock):
     web_client_mock.get_playlist.assert_has_calls(expected_calls)
 
 
+def test_refresh_skips_unchanged_playlists(provider, web_client_mock):
+    web_playlists = web_client_mock.get_user_playlists.return_value
+    web_playlists[0]["snapshot_id"] = "1"
+    web_playlists[1]["snapshot_id"] = "2"
+    refresh(provider)
+    web_client_mock.get_playlist.reset_mock()
+
+    web_playlists[1]["snapshot_id"] = "3"
+    refresh(provider)
+
+    web_client_mock.get_playlist.assert_called_once_with(
+        "spotify:user:bob:playlist:baz"
+    )
+    assert provider._snapshot_ids == {
+        "spotify:user:alice:playlist:foo": "1",
+        "spotify:user:bob:playlist:baz": "3",
+    }
+
+
+def test_refresh_fetches_new_playlists(provider, web_client_mock):
+    web_playlists = web_client_mock.get_user_playlists.return_value
+    web_playlists[0]["snapshot_id"] = "1"
+    web_client_mock.get_user_playlists.return_value = web_playlists[:1]
+    refresh(provider)
+    web_client_mock.get_playlist.reset_mock()
+
+    web_playlists[1]["snapshot_id"] = "2"
+    web_client_mock.get_user_playlists.return_value = web_playlists
+    refresh(provider)
+
+    web_client_mock.get_playlist.assert_called_once_with(
+        "spotify:user:bob:playlist:baz"
+    )
+
+
+def test_refresh_drops_removed_playlists(provider, web_client_mock, caplog):
+    web_playlists = web_client_mock.get_user_playlists.return_value
+    web_playlists[0]["snapshot_id"] = "1"
+    web_playlists[1]["snapshot_id"] = "2"
+    refresh(provider)
+
+    web_client_mock.get_user_playlists.return_value = web_playlists[1:]
+    refresh(provider)
+
+    assert provider._snapshot_ids == {"spotify:user:bob:playlist:baz": "2"}
+    assert (
+        "Fetched 0 new or changed Spotify playlists, "
+        "dropped 1 removed playlists" in caplog.text
+    )
+
+
+def test_refresh_retries_failed_playlists(provider, web_client_mock):
+    web_playlists = web_client_mock.get_user_playlists.return_value
+    web_playlists[0]["snapshot_id"] = "1"
+    web_client_mock.get_playlist.side_effect = None
+    web_client_mock.get_playlist.return_value = {}
+    refresh(provider)
+    web_client_mock.get_playlist.reset_mock()
+
+    refresh(provider)
+
+    web_client_mock.get_playlist.assert_any_call(
+        "spotify:user:alice:playlist:foo"
+    )
+
+
+def test_refresh_keeps_links_for_unchanged_playlists(provider, web_client_mock):
+    web_playlists = web_client_mock.get_user_playlists.return_value
+    web_playlists[0]["snapshot_id"] = "1"
+    refresh(provider)
+    playlists._sp_links["bar"] = "foobar"
+
+    refresh(provider)
+
+    assert "bar" in playlists._sp_links
+
+
+def test_refresh_runs_in_background(provider, web_client_mock):
+    started = threading.Event()
+    finish = threading.Event()
+
+    def get_user_playlists():
+        started.set()
+        finish.wait()
+        return []
+
+    web_client_mock.get_user_playlists.side_effect = get_user_playlists
+
+    provider.refresh()
+    started.wait()
+
+    assert provider.refreshing
+    finish.set()
+    provider._refresh_thread.join()
+    assert not provider.refreshing
+
+
+def test_stop_refresh_waits_for_running_refresh(provider, web_client_mock):
+    started = threading.Event()
+    finish = threading.Event()
+
+    def get_playlist(uri):
+        started.set()
+        finish.wait()
+
+    web_client_mock.get_playlist.side_effect = get_playlist
+    provider._loaded = False
+
+    provider.refresh()
+    started.wait()
+    thread = provider._refresh_thread
+    stopper = threading.Thread(target=provider.stop_refresh)
+    stopper.start()
+    assert provider._refresh_stopped.wait(timeout=1)
+    finish.set()
+    stopper.join()
+
+    assert not thread.is_alive()
+    assert not provider.refreshing
+    web_client_mock.get_playlist.assert_called_once()
+    web_client_mock.save_cache.assert_not_called()
+    assert not provider._loaded
+
+
+def test_refresh_after_stop_refresh_does_nothing(provider, web_client_mock):
+    provider.stop_refresh()
+
+    provider.refresh()
+
+    assert not provider.refreshing
+    web_client_mock.get_user_playlists.assert_not_called()
+
+
+def test_refresh_while_refreshing_runs_again(provider, web_client_mock):
+    provider._refresh_thread = mock.Mock()
+
+    provider.refresh()
+
+    assert provider._refresh_pending
+    provider._refresh_worker()
+    assert web_client_mock.get_user_playlists.call_count == 2
+    assert provider._refresh_thread is None
+    assert not provider._refresh_pending
+
+
+def test_refresh_failure_is_logged(provider, web_client_mock, caplog):
+    web_client_mock.get_user_playlists.side_effect = Exception("foo")
+
+    refresh(provider)
+
+    assert "Refreshing Spotify playlists failed" in caplog.text
+    assert not provider.refreshing
+
+
+def test_refresh_publishes_playlist_refs(provider, web_client_mock):
+    refresh(provider)
+    web_client_mock.get_user_playlists.reset_mock()
+
+    result = provider.as_list()
+
+    web_client_mock.get_user_playlists.assert_not_called()
+    assert result == [
+        Ref.playlist(uri="spotify:user:alice:playlist:foo", name="Foo"),
+        Ref.playlist(uri="spotify:user:bob:playlist:baz", name="Baz (by bob)"),
+    ]
+
+
+def test_refresh_publishes_partial_results(provider, web_client_mock):
+    web_playlists = web_client_mock.get_user_playlists.return_value
+    web_playlists[0]["snapshot_id"] = "1"
+    web_playlists[1]["snapshot_id"] = "2"
+    refresh(provider)
+    results = []
+
+    def get_playlist(uri):
+        results.append((provider.as_list(), provider.refresh_progress))
+        return {}
+
+    web_playlists[0]["name"] = "Qux"
+    web_playlists[0]["snapshot_id"] = "3"
+    web_client_mock.get_playlist.side_effect = get_playlist
+    refresh(provider)
+
+    assert results == [
+        (
+            [
+                Ref.playlist(uri="spotify:user:alice:playlist:foo", name="Foo"),
+                Ref.playlist(
+                    uri="spotify:user:bob:playlist:baz", name="Baz (by bob)"
+                ),
+            ],
+            (0, 2),
+        )
+    ]
+    assert provider.as_list()[0].name == "Qux"
+    assert provider.refresh_progress == (2, 2)
+
+
+def test_refresh_sends_playlists_loaded(
+    provider, web_client_mock, backend_listener_mock
+):
+    refresh(provider)
+
+    backend_listener_mock.send.assert_called_once_with("playlists_loaded")
+
+
 def test_refresh_when_not_logged_in(provider, web_client_mock):
     provider._loaded = False
     web_client_mock.logged_in = False
 
-    provider.refresh()
+    refresh(provider)
 
     web_client_mock.get_user_playlists.assert_not_called()
     web_client_mock.get_playlist.assert_not_called()
@@ -169,7 +383,7 @@ def test_refresh_when_not_logged_in(provider, web_client_mock):
 def test_refresh_sets_loaded(provider, web_client_mock):
     provider._loaded = False
 
-    provider.refresh()
+    refresh(provider)
 
     web_client_mock.get_user_playlists.assert_called_once()
     web_client_mock.get_playlist.assert_called()
@@ -177,7 +391,7 @@ def test_refresh_sets_loaded(provider, web_client_mock):
 
 
 def test_refresh_counts_playlists(provider, caplog):
-    provider.refresh()
+    refresh(provider)
 
     assert "Refreshed 2 Spotify playlists" in caplog.text
 
@@ -185,10 +399,40 @@ def test_refresh_counts_playlists(provider, caplog):
 def test_refresh_clears_caches(provider, web_client_mock):
     playlists._sp_links = {"bar": "foobar"}
 
-    provider.refresh()
+    with mock.patch.object(playlists.translator, "clear_caches") as clear_mock:
+        refresh(provider)
 
     assert "bar" not in playlists._sp_links
     web_client_mock.clear_cache.assert_called_once()
+    clear_mock.assert_called_once_with()
+
+
+def test_refresh_caches_playlist_images(provider, web_client_mock):
+    web_playlists = web_client_mock.get_user_playlists.return_value
+    web_playlists[0]["uri"] = "spotify:playlist:foo"
+    web_playlists[0]["images"] = [{"height": 1, "url": "img://foo", "width": 1}]
+
+    with mock.patch.object(playlists.images, "_cache", images.ImageCache()):
+        refresh(provider)
+
+        result = images.get_images(web_client_mock, ["spotify:playlist:foo"])
+
+    assert result["spotify:playlist:foo"][0].uri == "img://foo"
+    web_client_mock.get_one.assert_not_called()
+
+
+def test_refresh_caches_album_images(provider, web_client_mock, web_track_mock):
+    web_track_mock["album"]["images"] = [
+        {"height": 1, "url": "img://def", "width": 1}
+    ]
+
+    with mock.patch.object(playlists.images, "_cache", images.ImageCache()):
+        refresh(provider)
+
+        result = images.get_images(web_client_mock, ["spotify:track:abc"])
+
+    assert result["spotify:track:abc"][0].uri == "img://def"
+    web_client_mock.get.assert_not_called()
 
 
 def test_lookup(provider):
@@ -306,3 +550,71 @@ def test_playlist_lookup_when_link_invalid(
 
     assert len(playlist.tracks) == 1
     assert "Failed to get link 'spotify:track:abc'" in caplog.text
+
+
+def test_playlist_lookup_caches_album_images(
+    session_mock, web_client_mock, web_playlist_mock, web_track_mock
+):
+    web_track_mock["album"]["images"] = [
+        {"height": 640, "url": "img://def", "width": 640}
+    ]
+    web_track_mock["linked_from"] = {"uri": "spotify:track:xyz"}
+    web_client_mock.get_playlist.side_effect = None
+    web_client_mock.get_playlist.return_value = web_playlist_mock
+    uris = ["spotify:album:def", "spotify:track:abc", "spotify:track:xyz"]
+
+    with mock.patch.object(images, "_cache", images.ImageCache()):
+        playlists.playlist_lookup(
+            session_mock,
+            web_client_mock,
+            "spotify:user:alice:playlist:foo",
+            160,
+            cache_images=True,
+        )
+
+        result = images.get_images(web_client_mock, uris)
+
+    assert [result[uri][0].uri for uri in uris] == ["img://def"] * 3
+    assert result[uris[0]] is result[uris[1]]
+    web_client_mock.get.assert_not_called()
+
+
+def test_playlist_lookup_does_not_cache_images_by_default(
+    session_mock, web_client_mock, web_playlist_mock, web_track_mock
+):
+    web_track_mock["album"]["images"] = []
+    web_client_mock.get_playlist.side_effect = None
+    web_client_mock.get_playlist.return_value = web_playlist_mock
+
+    with mock.patch.object(images, "_cache", images.ImageCache()):
+        playlists.playlist_lookup(
+            session_mock,
+            web_client_mock,
+            "spotify:user:alice:playlist:foo",
+            160,
+        )
+
+        assert len(images._cache) == 0
+
+
+def test_playlist_lookup_ignores_tracks_without_images(
+    session_mock, web_client_mock, web_playlist_mock, web_track_mock
+):
+    local_track = {"uri": "spotify:local:foo:bar:baz:1", "album": {}}
+    web_playlist_mock["tracks"]["items"].append({"track": local_track})
+    web_playlist_mock["tracks"]["items"].append({"track": None})
+    web_client_mock.get_playlist.side_effect = None
+    web_client_mock.get_playlist.return_value = web_playlist_mock
+
+    with mock.patch.object(images, "_cache", images.ImageCache()):
+        playlist = playlists.playlist_lookup(
+            session_mock,
+            web_client_mock,
+            "spotify:user:alice:playlist:foo",
+            160,
+            cache_images=True,
+        )
+
+        assert len(images._cache) == 0
+
+    assert playlist is not None
@@ -7,6 +7,58 @@ import spotify
 from mopidy_spotify import translator
 
 
+class TestMemoized:
+    @pytest.fixture
+    def func(self):
+        func = translator.memoized(mock.Mock(side_effect=lambda x: [x]))
+        yield func
+        translator.memoized._instances.remove(func)
+
+    def test_caches_results(self, func):
+        assert func(1) is func(1)
+        assert func.func.call_count == 1
+
+    def test_evicts_least_recently_used(self, func):
+        func.max_size = 2
+        func(1)
+        func(2)
+        func(1)
+
+        func(3)
+
+        assert list(func.cache.keys()) == [(1,), (3,)]
+
+    def test_unhashable_args_are_not_cached(self, func):
+        assert func([1]) == [[1]]
+        assert func([1]) == [[1]]
+        assert func.func.call_count == 2
+        assert len(func.cache) == 0
+
+    def test_cache_info(self, func):
+        func(1)
+        func(1)
+        func(2)
+
+        assert func.cache_info() == translator.CacheInfo(
+            hits=1, misses=2, max_size=10000, size=2
+        )
+
+    def test_cache_clear(self, func):
+        func(1)
+
+        func.cache_clear()
+
+        assert func.cache_info() == translator.CacheInfo(0, 0, 10000, 0)
+
+    def test_clear_caches(self, func):
+        func(1)
+
+        translator.clear_caches()
+
+        assert len(func.cache) == 0
+        assert len(translator.to_track.cache) == 0
+
+
 class TestToArtist:
     def test_returns_none_if_unloaded(self, sp_artist_mock):
         sp_artist_mock.is_loaded = False
@@ -687,6 +739,20 @@ class TestWebToArtist:
         assert artist.uri == "spotify:artist:abba"
         assert artist.name == "ABBA"
 
+    def test_interns_results(self, web_artist_mock):
+        artist1 = translator.web_to_artist(web_artist_mock)
+        artist2 = translator.web_to_artist(dict(web_artist_mock))
+
+        assert artist1 is artist2
+
+    def test_interned_by_name(self, web_artist_mock):
+        artist1 = translator.web_to_artist(web_artist_mock)
+        web_artist_mock["name"] = "ABBA!"
+        artist2 = translator.web_to_artist(web_artist_mock)
+
+        assert artist1 is not artist2
+        assert artist2.name == "ABBA!"
+
 
 class TestWebToAlbum:
     def test_calls_web_to_album_ref(self, web_album_mock):
@@ -716,6 +782,21 @@ class TestWebToAlbum:
         assert album.name == "DEF 456"
         assert list(album.artists) == artists
 
+    def test_interns_results(self, web_album_mock, web_track_mock):
+        album = translator.web_to_album(web_album_mock)
+        track = translator.web_to_track(web_track_mock)
+
+        assert track.album is album
+        assert next(iter(track.artists)) is next(iter(album.artists))
+
+    def test_interned_by_artists(self, web_album_mock):
+        album1 = translator.web_to_album(web_album_mock)
+        web_album_mock["artists"] = []
+        album2 = translator.web_to_album(web_album_mock)
+
+        assert album1 is not album2
+        assert list(album2.artists) == []
+
 
 class TestWebToTrack:
     def test_calls_web_to_track_ref(self, web_track_mock):
@@ -1,4 +1,8 @@
+import http.server
 import re
+import threading
+
+import pytest
 
 from mopidy_spotify import utils
 
@@ -8,3 +12,62 @@ def test_time_logger(caplog):
         pass
 
     assert re.match(r".*task took \d+ms.*", caplog.text)
+
+
+def test_histogram_snapshot_has_cumulative_buckets():
+    histogram = utils.Histogram([100, 10])
+    for value in [5, 10, 50, 500]:
+        histogram.observe(value)
+
+    assert histogram.snapshot() == {
+        "buckets": [(10, 2), (100, 3), (float("inf"), 4)],
+        "count": 4,
+        "sum": 565,
+    }
+
+
+def test_get_requests_session_mounts_instrumented_adapter():
+    session = utils.get_requests_session({}, pool_maxsize=25)
+
+    for prefix in ("http://", "https://"):
+        adapter = session.get_adapter(prefix)
+        assert isinstance(adapter, utils.InstrumentedHTTPAdapter)
+        assert adapter.max_retries.total == 0
+        assert adapter._pool_maxsize == 25
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_connection_stats_count_reused_connections(http_server):
+    session = utils.get_requests_session({})
+
+    for _ in range(3):
+        session.get(f"{http_server}/foo").raise_for_status()
+
+    stats = session.get_adapter(http_server).stats.snapshot()
+    assert stats["requests"] == 3
+    assert stats["new_connections"] == 1
+    assert stats["reused_connections"] == 2
+    assert stats["connect_time"]["count"] == 1
+    assert stats["tls_handshake_time"]["count"] == 0
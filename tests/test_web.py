@@ -1,3 +1,6 @@
+import concurrent.futures
+import threading
+import time
 import urllib
 from unittest import mock
 
@@ -6,7 +9,7 @@ import requests
 import responses
 
 import mopidy_spotify
-from mopidy_spotify import web
+from mopidy_spotify import cache, compact, web
 
 
 @pytest.fixture
@@ -51,6 +54,108 @@ def test_user_agent(oauth_client):
     )
 
 
+@pytest.fixture
+def fake_clock():
+    clock = mock.Mock()
+    clock.now = 1000.0
+
+    def sleep(seconds):
+        clock.now += seconds
+
+    with mock.patch.object(
+        web.time, "monotonic", side_effect=lambda: clock.now
+    ), mock.patch.object(web.time, "sleep", side_effect=sleep) as sleep_mock:
+        clock.sleep = sleep_mock
+        yield clock
+
+
+def test_rate_limiter_unlimited(fake_clock):
+    limiter = web.RateLimiter()
+
+    for _ in range(100):
+        assert limiter.acquire()
+
+    fake_clock.sleep.assert_not_called()
+    assert limiter.budget == float("inf")
+
+
+def test_rate_limiter_waits_for_tokens(fake_clock):
+    limiter = web.RateLimiter(rate=2, burst=2)
+
+    for _ in range(4):
+        assert limiter.acquire()
+
+    assert fake_clock.now == 1001.0
+    assert limiter.stats == {
+        "budget": 0.0,
+        "throttled_count": 2,
+        "throttled_time": 1.0,
+    }
+
+
+def test_rate_limiter_refills_up_to_burst(fake_clock):
+    limiter = web.RateLimiter(rate=2, burst=2)
+    limiter.acquire()
+
+    fake_clock.now += 10
+
+    assert limiter.budget == 2.0
+
+
+def test_rate_limiter_cooldown(fake_clock):
+    limiter = web.RateLimiter()
+
+    limiter.cooldown(5)
+
+    assert limiter.budget == 0.0
+    assert limiter.acquire()
+    assert fake_clock.now == 1005.0
+    assert limiter.stats["throttled_time"] == 5.0
+
+
+def test_rate_limiter_timeout(fake_clock):
+    limiter = web.RateLimiter()
+    limiter.cooldown(5)
+
+    assert not limiter.acquire(timeout=2)
+    fake_clock.sleep.assert_not_called()
+
+
+@responses.activate
+def test_retry_after_pauses_all_requests(oauth_client, fake_clock):
+    responses.add(
+        responses.GET,
+        "https://api.spotify.com/v1/tracks/abc",
+        status=429,
+        adding_headers={"Retry-After": "3"},
+    )
+    responses.add(
+        responses.GET, "https://api.spotify.com/v1/tracks/abc", json={}
+    )
+
+    result = oauth_client._request_with_retries(
+        "GET", "https://api.spotify.com/v1/tracks/abc"
+    )
+
+    assert result.status_ok
+    assert len(responses.calls) == 2
+    assert oauth_client._rate_limiter._cooldown_until == 1003.0
+    assert fake_clock.now == 1003.0
+
+
+@responses.activate
+def test_cooldown_longer_than_timeout_gives_up(oauth_client, fake_clock):
+    oauth_client._rate_limiter.cooldown(oauth_client._timeout + 30)
+
+    result = oauth_client._request_with_retries(
+        "GET", "https://api.spotify.com/v1/tracks/abc"
+    )
+
+    assert result is None
+    assert len(responses.calls) == 0
+    assert not oauth_client._authorization_failed
+
+
 @responses.activate
 def test_request_exception(oauth_client, caplog):
     responses.add(
@@ -412,6 +517,61 @@ def test_normalise_query_string(oauth_client, path, params, expected):
     assert result == expected
 
 
+@responses.activate
+def test_connection_stats(web_oauth_mock, oauth_client):
+    responses.add(
+        responses.POST,
+        "https://auth.mopidy.com/spotify/token",
+        json=web_oauth_mock,
+    )
+    responses.add(responses.GET, "https://api.spotify.com/v1/foo", json={})
+
+    oauth_client.get("foo")
+
+    stats = oauth_client.connection_stats
+    assert stats["requests"] == 2
+    assert stats["new_connections"] == 0
+
+
+def test_normalise_query_string_is_memoised(oauth_client):
+    web._normalise_query_string.cache_clear()
+
+    for _ in range(3):
+        oauth_client._normalise_query_string("tracks/abc", {"foo": "bar"})
+
+    assert web._normalise_query_string.cache_info().hits == 2
+
+
+def test_normalise_query_string_with_unhashable_params(oauth_client):
+    result = oauth_client._normalise_query_string(
+        "tracks/abc", {"ids": ["a", "b"]}
+    )
+
+    assert result == "tracks/abc?ids=%5B%27a%27%2C+%27b%27%5D"
+
+
+@pytest.mark.parametrize(
+    "url,args,kwargs,expected",
+    [
+        ("tracks/abc", (), {}, "https://api.spotify.com/v1/tracks/abc"),
+        (
+            "tracks/{}?market=SE",
+            ("abc",),
+            {"limit": 10},
+            "https://api.spotify.com/v1/tracks/abc?market=SE&limit=10",
+        ),
+        (
+            "https://example.com/foo?bar=1",
+            (),
+            {},
+            "https://example.com/foo?bar=1",
+        ),
+    ],
+)
+def test_prepare_url(oauth_client, url, args, kwargs, expected):
+    assert oauth_client._prepare_url(url, *args, **kwargs) == expected
+
+
 @responses.activate
 def test_web_response(web_track_mock, mock_time, oauth_client):
     responses.add(
@@ -512,6 +672,91 @@ def test_cache_response_ignore_expiry(
     assert result["uri"] == "spotify:track:abc"
 
 
+@responses.activate
+def test_get_waits_for_in_flight_request(oauth_client, web_response_mock):
+    in_flight = concurrent.futures.Future()
+    oauth_client._in_flight["tracks/abc"] = in_flight
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(oauth_client.get, "tracks/abc")
+        in_flight.set_result(web_response_mock)
+        result = future.result()
+
+    assert result is web_response_mock
+    assert len(responses.calls) == 0
+
+
+@responses.activate
+def test_get_waiting_for_in_flight_request_keeps_expiry(
+    oauth_client, web_response_mock
+):
+    in_flight = concurrent.futures.Future()
+    oauth_client._in_flight["tracks/abc"] = in_flight
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(
+            oauth_client.get, "tracks/abc", extra_expiry=10
+        )
+        in_flight.set_result(web_response_mock)
+        result = future.result()
+
+    assert result._expires == 1000
+
+
+@responses.activate
+def test_get_increases_expiry_of_fetched_response(
+    web_oauth_mock, web_track_mock, oauth_client
+):
+    responses.add(
+        responses.POST,
+        "https://auth.mopidy.com/spotify/token",
+        json=web_oauth_mock,
+    )
+    responses.add(
+        responses.GET,
+        "https://api.spotify.com/v1/tracks/abc",
+        json=web_track_mock,
+        adding_headers={"Cache-Control": "max-age=100"},
+    )
+
+    with mock.patch.object(web.time, "time", return_value=1000):
+        result = oauth_client.get("tracks/abc", extra_expiry=10)
+
+    assert result._expires == 1110
+
+
+@responses.activate
+def test_get_shares_in_flight_request_failure(oauth_client):
+    in_flight = concurrent.futures.Future()
+    oauth_client._in_flight["tracks/abc"] = in_flight
+    in_flight.set_exception(RuntimeError("foo"))
+
+    with pytest.raises(RuntimeError):
+        oauth_client.get("tracks/abc")
+
+
+@responses.activate
+def test_get_clears_in_flight_request(
+    web_oauth_mock, web_track_mock, oauth_client
+):
+    responses.add(
+        responses.POST,
+        "https://auth.mopidy.com/spotify/token",
+        json=web_oauth_mock,
+    )
+    responses.add(
+        responses.GET,
+        "https://api.spotify.com/v1/tracks/abc",
+        json=web_track_mock,
+    )
+
+    oauth_client.get("tracks/abc")
+    oauth_client.get("tracks/abc")
+
+    assert oauth_client._in_flight == {}
+    assert len(responses.calls) == 3
+
+
 @responses.activate
 def test_dont_cache_bad_status(web_track_mock, mock_time, oauth_client):
     cache = {}
@@ -615,6 +860,36 @@ def test_cache_miss_no_etag(web_response_mock_etag, oauth_client, mock_time):
     assert cache["tracks/xyz"] == result
 
 
+def test_web_response_expire(web_response_mock, mock_time):
+    mock_time.return_value = 1
+
+    web_response_mock.expire()
+
+    assert not web_response_mock.still_valid()
+
+
+def test_web_response_as_dict_roundtrip(web_response_mock_etag):
+    result = web.WebResponse.from_dict(web_response_mock_etag.as_dict())
+
+    assert result == web_response_mock_etag
+    assert result.url == web_response_mock_etag.url
+    assert result._expires == web_response_mock_etag._expires
+    assert result._etag == web_response_mock_etag._etag
+    assert result._status_code == web_response_mock_etag._status_code
+    assert result.size == web_response_mock_etag.size
+
+
+@pytest.mark.parametrize(
+    "expires,etag,expected",
+    [(1001, None, True), (999, '"1234"', True), (999, None, False)],
+)
+def test_web_response_reusable(mock_time, expires, etag, expected):
+    mock_time.return_value = 1000
+    response = web.WebResponse("foo", {}, expires=expires, etag=etag)
+
+    assert response.reusable is expected
+
+
 def test_increase_expiry(web_response_mock):
     web_response_mock.increase_expiry(30)
 
@@ -752,6 +1027,18 @@ class TestSpotifyOAuthClient:
             == "https://auth.mopidy.com/spotify/token"
         )
 
+    def test_configures_overridden_urls(self):
+        client = web.SpotifyOAuthClient(
+            client_id=None,
+            client_secret=None,
+            proxy_config=None,
+            base_url="http://localhost:8080/v1",
+            refresh_url="http://localhost:8080/api/token",
+        )
+
+        assert client._base_url == "http://localhost:8080/v1"
+        assert client._refresh_url == "http://localhost:8080/api/token"
+
     @responses.activate
     def test_login_alice(self, spotify_client, caplog):
         responses.add(responses.GET, self.url("me"), json={"id": "alice"})
@@ -813,6 +1100,100 @@ class TestSpotifyOAuthClient:
         assert results[0].get("n") == 1
         assert results[1].get("n") == 2
 
+    @responses.activate
+    def test_get_all_concurrent(self, spotify_client):
+        responses.add(
+            responses.GET,
+            self.url("page"),
+            json={
+                "n": 1,
+                "total": 5,
+                "next": self.url("page?offset=1&limit=2"),
+            },
+        )
+        for n, offset in [(2, 1), (3, 3)]:
+            responses.add(
+                responses.GET,
+                self.url(f"page?limit=2&offset={offset}"),
+                json={"n": n, "next": "bogus"},
+            )
+
+        results = list(spotify_client.get_all("page"))
+
+        assert len(responses.calls) == 3
+        assert [r.get("n") for r in results] == [1, 2, 3]
+
+    def test_get_page_executor_is_shared(self, spotify_client):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as pool:
+            executors = list(
+                pool.map(
+                    lambda _: spotify_client._get_page_executor(), range(8)
+                )
+            )
+
+        assert all(e is executors[0] for e in executors)
+        spotify_client.close()
+
+    def test_close_shuts_down_page_executor(self, spotify_client):
+        executor = spotify_client._get_page_executor()
+
+        spotify_client.close()
+
+        assert spotify_client._page_executor is None
+        with pytest.raises(RuntimeError):
+            executor.submit(print)
+
+    @responses.activate
+    def test_get_all_concurrent_disabled(self, config):
+        client = web.SpotifyOAuthClient(
+            client_id=config["spotify"]["client_id"],
+            client_secret=config["spotify"]["client_secret"],
+            proxy_config=None,
+            page_workers=1,
+        )
+        responses.add(
+            responses.GET,
+            self.url("page"),
+            json={
+                "n": 1,
+                "total": 5,
+                "next": self.url("page?offset=1&limit=2"),
+            },
+        )
+        responses.add(
+            responses.GET,
+            self.url("page?limit=2&offset=1"),
+            json={"n": 2},
+        )
+
+        results = list(client.get_all("page"))
+
+        assert len(responses.calls) == 2
+        assert [r.get("n") for r in results] == [1, 2]
+
+    @pytest.mark.parametrize(
+        "page",
+        [
+            {"next": "https://api.spotify.com/v1/page?offset=1&limit=2"},
+            {"total": 5, "next": "https://api.spotify.com/v1/page"},
+            {"total": 5, "next": "https://api.spotify.com/v1/page?offset=a"},
+            {"total": 5, "next": None},
+        ],
+    )
+    def test_get_page_paths_not_possible(self, page):
+        assert web._get_page_paths(page) == []
+
+    def test_get_page_paths(self):
+        page = {
+            "total": 250,
+            "next": "https://api.spotify.com/v1/foo?offset=100&limit=100&x=y",
+        }
+
+        assert web._get_page_paths(page) == [
+            "https://api.spotify.com/v1/foo?offset=100&limit=100&x=y",
+            "https://api.spotify.com/v1/foo?offset=200&limit=100&x=y",
+        ]
+
     @responses.activate
     def test_get_all_none(self, spotify_client):
         results = list(spotify_client.get_all(None))
@@ -983,6 +1364,39 @@ class TestSpotifyOAuthClient:
         assert len(responses.calls) == 2
         assert result["tracks"]["items"] == [1, 2, 3, 4, 5]
 
+    @responses.activate
+    def test_get_playlist_caches_compact_tracks(
+        self, spotify_client, web_track_mock
+    ):
+        responses.add(
+            responses.GET,
+            self.url("playlists/foo"),
+            json={
+                "tracks": {
+                    "items": [{"track": web_track_mock}],
+                    "next": "playlists/foo/tracks",
+                }
+            },
+        )
+        responses.add(
+            responses.GET,
+            self.url("playlists/foo/tracks"),
+            json={"items": [{"track": web_track_mock}]},
+        )
+
+        result = spotify_client.get_playlist("spotify:playlist:foo")
+
+        items = result["tracks"]["items"]
+        assert items == [{"track": web_track_mock}] * 2
+        assert isinstance(items[0]["track"], compact.Track)
+        assert items[0]["track"] is items[1]["track"]
+        cached = [
+            response.get("tracks", response)["items"]
+            for _, response in spotify_client._cache.items()
+        ]
+        assert [type(items) for items in cached] == [compact.TrackList] * 2
+        assert [len(items) for items in cached] == [1, 1]
+
     @responses.activate
     def test_get_playlist_uses_cached_tracks_when_unchanged(
         self, mock_time, spotify_client
@@ -1025,13 +1439,144 @@ class TestSpotifyOAuthClient:
         assert spotify_client.get_playlist(uri) == {}
         assert f"Could not parse {uri!r} as a {msg} URI" in caplog.text
 
-    def test_clear_cache(self, spotify_client):
-        spotify_client._cache = {"foo": "bar"}
+    @responses.activate
+    def test_cache_stats(self, spotify_client):
+        responses.add(responses.GET, self.url("foo"), body="{}")
+
+        spotify_client.get_one("foo")
+        spotify_client.get_one("foo")
+
+        assert spotify_client.cache_stats == {
+            "entries": 1,
+            "bytes": 2,
+            "hits": 1,
+            "misses": 1,
+            "evictions": 0,
+        }
+
+    @responses.activate
+    def test_cache_max_entries(self, config):
+        client = web.SpotifyOAuthClient(
+            client_id=config["spotify"]["client_id"],
+            client_secret=config["spotify"]["client_secret"],
+            proxy_config=None,
+            cache_max_entries=1,
+        )
+        responses.add(responses.GET, self.url("foo"))
+        responses.add(responses.GET, self.url("bar"))
+
+        client.get_one("foo")
+        client.get_one("bar")
+
+        assert "foo" not in client._cache
+        assert "bar" in client._cache
+        assert client.cache_stats["evictions"] == 1
+
+    def test_clear_cache(self, spotify_client, web_response_mock):
+        spotify_client._cache = {"foo": web_response_mock}
 
         spotify_client.clear_cache()
 
         assert {} == spotify_client._cache
 
+    def test_clear_cache_expires_responses_with_etag(
+        self, spotify_client, web_response_mock_etag
+    ):
+        spotify_client._cache = {"foo": web_response_mock_etag}
+
+        spotify_client.clear_cache()
+
+        assert spotify_client._cache == {"foo": web_response_mock_etag}
+        assert not web_response_mock_etag.still_valid()
+
+    def test_save_cache_without_cache_path(self, spotify_client):
+        spotify_client._cache = {"foo": mock.Mock()}
+
+        spotify_client.save_cache()
+
+        spotify_client._cache["foo"].as_dict.assert_not_called()
+
+    def test_save_and_load_cache(
+        self, config, tmp_path, web_response_mock, web_response_mock_etag
+    ):
+        client = web.SpotifyOAuthClient(
+            client_id=config["spotify"]["client_id"],
+            client_secret=config["spotify"]["client_secret"],
+            proxy_config=None,
+            cache_path=tmp_path / "web_cache.db",
+        )
+        client._cache = {
+            "foo": web_response_mock,
+            "bar": web_response_mock_etag,
+        }
+
+        client.save_cache()
+        client = web.SpotifyOAuthClient(
+            client_id=config["spotify"]["client_id"],
+            client_secret=config["spotify"]["client_secret"],
+            proxy_config=None,
+            cache_path=tmp_path / "web_cache.db",
+        )
+
+        assert list(client._cache.keys()) == ["bar"]
+        result = client._cache["bar"]
+        assert result == web_response_mock_etag
+        assert result.url == web_response_mock_etag.url
+        assert result.etag_headers == {"If-None-Match": '"1234"'}
+        assert result.status_ok
+
+    def test_save_and_load_cache_with_compact_tracks(
+        self, config, tmp_path, web_response_mock_etag, web_track_mock
+    ):
+        items = [{"track": web_track_mock}, {"track": None}]
+        web_response_mock_etag["items"] = compact.TrackList.from_items(items)
+        client = web.SpotifyOAuthClient(
+            client_id=config["spotify"]["client_id"],
+            client_secret=config["spotify"]["client_secret"],
+            proxy_config=None,
+            cache_path=tmp_path / "web_cache.db",
+        )
+        client._cache = {"foo": web_response_mock_etag}
+
+        client.save_cache()
+        client = web.SpotifyOAuthClient(
+            client_id=config["spotify"]["client_id"],
+            client_secret=config["spotify"]["client_secret"],
+            proxy_config=None,
+            cache_path=tmp_path / "web_cache.db",
+        )
+
+        result = client._cache["foo"]["items"]
+        assert isinstance(result, compact.TrackList)
+        assert result == items
+
+    @responses.activate
+    def test_loaded_cache_is_revalidated(
+        self, config, tmp_path, web_response_mock_etag, mock_time
+    ):
+        cache_path = tmp_path / "web_cache.db"
+        web_response_mock_etag.url = self.url("foo")
+        cache.PersistentStore(cache_path).save(
+            {"foo": web_response_mock_etag.as_dict()}
+        )
+        responses.add(
+            responses.GET, self.url("foo"), status=304, adding_headers={}
+        )
+        mock_time.return_value = 2000
+        client = web.SpotifyOAuthClient(
+            client_id=config["spotify"]["client_id"],
+            client_secret=config["spotify"]["client_secret"],
+            proxy_config=None,
+            cache_path=cache_path,
+        )
+
+        result = client.get_one("foo")
+
+        assert len(responses.calls) == 1
+        assert responses.calls[0].request.headers["If-None-Match"] == '"1234"'
+        assert result == web_response_mock_etag
+        assert result.status_unchanged
+
     @pytest.mark.parametrize(
         "user_id,expected", [("alice", True), (None, False)]
     )
@@ -1041,6 +1586,90 @@ class TestSpotifyOAuthClient:
         assert spotify_client.logged_in is expected
 
 
+@pytest.fixture
+def async_client():
+    web_client = mock.Mock(spec=web.SpotifyOAuthClient)
+    client = web.AsyncSpotifyOAuthClient(web_client, max_concurrency=2)
+    yield client
+    client.close()
+
+
+def test_async_client_get_many_bounds_concurrency(async_client):
+    lock = threading.Lock()
+    in_flight = []
+    max_in_flight = []
+
+    def get_one(path, params=None):
+        with lock:
+            in_flight.append(path)
+            max_in_flight.append(len(in_flight))
+        time.sleep(0.01)
+        with lock:
+            in_flight.remove(path)
+        return {"path": path, "params": params}
+
+    async_client._web_client.get_one.side_effect = get_one
+
+    result = async_client.get_many([(f"p{i}", {"i": i}) for i in range(6)])
+
+    assert result == [{"path": f"p{i}", "params": {"i": i}} for i in range(6)]
+    assert max(max_in_flight) == 2
+
+
+def test_async_client_call_many_returns_results_in_order(async_client):
+    first_done = threading.Event()
+
+    def slow():
+        assert first_done.wait(timeout=5)
+        return "slow"
+
+    def fast(value):
+        first_done.set()
+        return value
+
+    result = async_client.call_many([(slow,), (fast, "fast")])
+
+    assert result == ["slow", "fast"]
+
+
+def test_async_client_get_all_fetches_remaining_pages(async_client):
+    web_client = async_client._web_client
+    first = {"next": "items?offset=1&limit=1", "total": 3}
+    web_client.get_one.side_effect = lambda path: (
+        first if path == "items" else path
+    )
+
+    async def get_pages():
+        return [page async for page in async_client.get_all("items")]
+
+    assert async_client.run(get_pages()) == [
+        first,
+        "items?offset=1&limit=1",
+        "items?offset=2&limit=1",
+    ]
+
+
+def test_async_client_get_playlist(async_client):
+    async_client._web_client.get_playlist.return_value = {"name": "Foo"}
+
+    result = async_client.run(async_client.get_playlist("spotify:playlist:a"))
+
+    assert result == {"name": "Foo"}
+    async_client._web_client.get_playlist.assert_called_once_with(
+        "spotify:playlist:a"
+    )
+
+
+def test_async_client_close_stops_event_loop(async_client):
+    async_client.run(async_client.get("me"))
+    thread = async_client._thread
+
+    async_client.close()
+
+    assert not thread.is_alive()
+    assert async_client._loop is None
+
+
 @pytest.mark.parametrize(
     "uri,type_,id_",
     [